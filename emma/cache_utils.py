@@ -0,0 +1,180 @@
+"""Caching and request coalescing utils."""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory used by a value, following containers and object attributes."""
+    size = 0
+    seen: set[int] = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, pd.DataFrame):
+            size += int(obj.memory_usage(deep=True).sum())
+            continue
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return size
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls.
+
+    While a call for a key is in flight, other callers with the same key wait for it and share its
+    result (or exception) instead of issuing their own. Must be used from a single event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self.coalesced: int = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded, so that a caller giving up (e.g. on timeout) doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even when every caller has given up
+            future.exception()
+
+
+class PartitionedCache:
+    """Key-value cache partitioned by Infrahub address and branch.
+
+    Entries of one instance (or one branch of it) can be dropped without touching the others. With
+    `max_size`, the approximate size of each entry is measured when it is set and the least recently used
+    entries are evicted to stay within that many bytes. With `ttl`, entries expire that many seconds after
+    being set. Values are shared by reference between callers, which must not modify them.
+    """
+
+    def __init__(self, max_size: int | None = None, ttl: float | None = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._partitions: dict[tuple[str, str | None], dict[Hashable, Any]] = {}
+        # Size and expiry time of every entry, least recently used first
+        self._entries: OrderedDict[tuple[tuple[str, str | None], Hashable], tuple[int, float | None]] = OrderedDict()
+        self._size = 0
+        # Number of entries and their size by address
+        self._address_entries: Counter[str] = Counter()
+        self._address_sizes: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _partition_key(address: str, branch: str | None) -> tuple[str, str | None]:
+        return address.rstrip("/"), branch
+
+    def get(self, address: str, branch: str | None, key: Hashable, default: Any = None) -> Any:
+        partition = self._partition_key(address, branch)
+        with self._lock:
+            entry = self._entries.get((partition, key))
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(partition, key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end((partition, key))
+            self.hits += 1
+            return self._partitions[partition][key]
+
+    def set(self, address: str, branch: str | None, key: Hashable, value: Any) -> None:
+        partition = self._partition_key(address, branch)
+        # Measured before taking the lock, which large DataFrames would otherwise hold for long
+        size = estimate_size(value) if self.max_size is not None else 0
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if (partition, key) in self._entries:
+                self._remove(partition, key)
+            if self.max_size is not None and size > self.max_size:
+                self.evictions += 1
+                return
+            self._partitions.setdefault(partition, {})[key] = value
+            self._entries[partition, key] = (size, expires_at)
+            self._size += size
+            self._address_entries[partition[0]] += 1
+            self._address_sizes[partition[0]] += size
+            while self.max_size is not None and self._size > self.max_size:
+                self._remove(*next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, partition: tuple[str, str | None], key: Hashable) -> None:
+        size, _ = self._entries.pop((partition, key))
+        self._size -= size
+        self._address_sizes[partition[0]] -= size
+        self._address_entries[partition[0]] -= 1
+        if not self._address_entries[partition[0]]:
+            del self._address_entries[partition[0]]
+            del self._address_sizes[partition[0]]
+        entries = self._partitions[partition]
+        del entries[key]
+        if not entries:
+            del self._partitions[partition]
+
+    def invalidate(self, address: str, branch: str | None = None) -> int:
+        """Drop the entries of an address, or of a single branch of it, and return how many were dropped."""
+        address = address.rstrip("/")
+        with self._lock:
+            entries = [
+                (partition, key)
+                for partition, keys in self._partitions.items()
+                if partition[0] == address and (branch is None or partition[1] == branch)
+                for key in keys
+            ]
+            for partition, key in entries:
+                self._remove(partition, key)
+            return len(entries)
+
+    def usage(self) -> dict[str, int]:
+        """Return the measured size in bytes of the entries of each address, always 0 without `max_size`."""
+        with self._lock:
+            return dict(self._address_sizes)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of entries, their measured size in bytes and the hit, miss and eviction counts."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
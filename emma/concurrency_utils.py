@@ -0,0 +1,129 @@
+"""Concurrency utils: limit the requests in flight, adapting the limit to the health of the server."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from httpx import HTTPError, HTTPStatusError
+from infrahub_sdk.exceptions import ServerNotReachableError, ServerNotResponsiveError
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Number of latest call latencies the percentiles are computed from
+LATENCY_WINDOW = 1000
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Return whether an error means that the server is overloaded: a timeout, a refused connection or a 5xx/429."""
+    if isinstance(exc, HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (TimeoutError, ServerNotResponsiveError, ServerNotReachableError, HTTPError))
+
+
+class ConcurrencyStats(BaseModel):
+    """Snapshot of the calls made through a `ConcurrencyLimiter`."""
+
+    limit: int
+    in_flight: int
+    completed: int
+    failed: int
+    backoffs: int
+    # Calls completed per second, failed or not, since the first one started
+    throughput: float
+    # 95th percentile of the latest latencies, in seconds
+    p95_latency: float | None
+
+
+class ConcurrencyLimiter:
+    """Limit the number of calls in flight, to a static maximum or adapting it to the server's health.
+
+    With `adaptive`, the limit starts at `min_in_flight` and follows AIMD: it grows by one each time as
+    many calls as the limit have completed with a latency within `latency_tolerance` times the lowest one
+    seen, and is halved when a call fails because the server is overloaded (see `is_overload`). Calls
+    started before a backoff don't trigger another one, so a burst of timeouts halves the limit only once.
+    Must be used from a single event loop.
+    """
+
+    def __init__(
+        self, max_in_flight: int, adaptive: bool = False, min_in_flight: int = 1, latency_tolerance: float = 2.0
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.adaptive = adaptive
+        self.min_in_flight = max(1, min(min_in_flight, self.max_in_flight))
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(self.min_in_flight if adaptive else self.max_in_flight)
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.backoffs = 0
+        self._min_latency: float | None = None
+        self._last_backoff = -math.inf
+        self._started_at: float | None = None
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call `func` once fewer calls than the limit are in flight, recording its latency and outcome."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        started = time.monotonic()
+        if self._started_at is None:
+            self._started_at = started
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as exc:
+            self.record(started=started, failed=True, overloaded=is_overload(exc))
+            raise
+        else:
+            self.record(started=started)
+            return result
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, started: float, failed: bool = False, overloaded: bool = False) -> None:
+        """Record the outcome of a call started at `started`, adapting the limit when `adaptive`."""
+        now = time.monotonic()
+        latency = now - started
+        self._latencies.append(latency)
+        if failed:
+            self.failed += 1
+        else:
+            self.completed += 1
+        if not self.adaptive:
+            return
+
+        if overloaded:
+            if started >= self._last_backoff:
+                self._limit = max(float(self.min_in_flight), self._limit / 2)
+                self._last_backoff = now
+                self.backoffs += 1
+            return
+        if failed:
+            return
+        self._min_latency = latency if self._min_latency is None else min(self._min_latency, latency)
+        if latency <= self._min_latency * self.latency_tolerance:
+            self._limit = min(float(self.max_in_flight), self._limit + 1 / self._limit)
+
+    def stats(self) -> ConcurrencyStats:
+        elapsed = time.monotonic() - self._started_at if self._started_at is not None else 0.0
+        latencies = sorted(self._latencies)
+        return ConcurrencyStats(
+            limit=self.limit,
+            in_flight=self.in_flight,
+            completed=self.completed,
+            failed=self.failed,
+            backoffs=self.backoffs,
+            throughput=(self.completed + self.failed) / elapsed if elapsed > 0 else 0.0,
+            p95_latency=latencies[math.ceil(0.95 * len(latencies)) - 1] if latencies else None,
+        )
@@ -0,0 +1,390 @@
+"""Export utils: build projection queries from a schema, turn their responses into rows and write them to files."""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import IO, Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from infrahub_sdk.graphql import Query
+from infrahub_sdk.schema import AttributeSchemaAPI, MainSchemaTypes, RelationshipSchemaAPI
+from pydantic import BaseModel, ConfigDict
+
+# Streamed exports are kept in memory up to this size, then spilled to a temporary file
+EXPORT_SPOOL_MAX_SIZE = int(os.environ.get("EMMA_EXPORT_SPOOL_MAX_SIZE", str(16 * 1024 * 1024)))
+# Number of rows of a streamed export kept to be displayed
+EXPORT_PREVIEW_ROWS = 100
+# Rows of a Parquet export are written in row groups of this size
+PARQUET_ROW_GROUP_SIZE = 10_000
+PARQUET_COMPRESSION = "zstd"
+
+# Fields fetched for every related node, enough to reference it in an export
+PEER_FIELDS: dict[str, Any] = {"id": None, "hfid": None, "__typename": None}
+
+# pandas dtype of exported attributes by kind, other attributes are kept as Python objects
+ATTRIBUTE_KIND_DTYPES: dict[str, str] = {
+    "Number": "Int64",
+    "Bandwidth": "Int64",
+    "Boolean": "boolean",
+    "Checkbox": "boolean",
+    "Dropdown": "category",
+    "IPHost": "string",
+    "IPNetwork": "string",
+}
+# Attribute kinds holding JSON documents, stored as JSON text in Parquet exports
+JSON_ATTRIBUTE_KINDS = {"JSON", "List", "Any"}
+
+
+def select_fields(
+    schema: MainSchemaTypes, columns: list[str] | None = None
+) -> tuple[list[AttributeSchemaAPI], list[RelationshipSchemaAPI]]:
+    """Return the attributes and relationships of a schema to export: all of them, or only those in `columns`."""
+    if columns is None:
+        return list(schema.attributes), list(schema.relationships)
+    selected = set(columns)
+    return (
+        [attribute for attribute in schema.attributes if attribute.name in selected],
+        [relationship for relationship in schema.relationships if relationship.name in selected],
+    )
+
+
+def build_projection_query(
+    schema: MainSchemaTypes,
+    offset: int,
+    limit: int,
+    include_id: bool = True,
+    columns: list[str] | None = None,
+    ids: list[str] | None = None,
+    include_updated_at: bool = False,
+) -> str:
+    """Build a query returning one page of objects of a kind, with attribute values and related nodes references.
+
+    Related nodes are only fetched as `id`, `hfid` and `__typename`, so the whole page takes a single request.
+    With `columns`, only those attributes and relationships are queried, and with `ids` only those objects.
+    With `include_updated_at`, the last update time of each object is queried too, as in `build_updates_query`.
+    """
+    attributes, relationships = select_fields(schema=schema, columns=columns)
+    node: dict[str, Any] = {"id": None} if include_id else {}
+    for attribute in attributes:
+        node[attribute.name] = {"value": None}
+    for relationship in relationships:
+        if relationship.cardinality == "one":
+            node[relationship.name] = {"node": PEER_FIELDS}
+        else:
+            node[relationship.name] = {"edges": {"node": PEER_FIELDS}}
+
+    filters: dict[str, Any] = {"offset": offset, "limit": limit}
+    if ids is not None:
+        filters["ids"] = ids
+    edges: dict[str, Any] = {"node": node}
+    if include_updated_at:
+        edges["node_metadata"] = {"updated_at": None}
+    query = Query(query={schema.kind: {"@filters": filters, "count": None, "edges": edges}})
+    return str(query.render())
+
+
+def build_updates_query(schema: MainSchemaTypes, offset: int, limit: int) -> str:
+    """Build a query returning one page of the IDs of the objects of a kind, with their last update time."""
+    query = Query(
+        query={
+            schema.kind: {
+                "@filters": {"offset": offset, "limit": limit},
+                "count": None,
+                "edges": {"node": {"id": None}, "node_metadata": {"updated_at": None}},
+            }
+        }
+    )
+    return str(query.render())
+
+
+def peer_to_string(peer: dict[str, Any]) -> str:
+    """Reference a related node as `<kind>__<hfid>`, or by its ID when its kind has no human friendly ID."""
+    if peer.get("hfid"):
+        return "__".join([peer["__typename"], *peer["hfid"]])
+    return str(peer["id"])
+
+
+def node_to_row(
+    schema: MainSchemaTypes, node: dict[str, Any], include_id: bool = True, columns: list[str] | None = None
+) -> dict[str, Any]:
+    """Convert a node of a projection query response to an export row."""
+    attributes, relationships = select_fields(schema=schema, columns=columns)
+    row: dict[str, Any] = {}
+    if include_id:
+        row["index"] = node.get("id")
+
+    for attribute in attributes:
+        value = node.get(attribute.name)
+        row[attribute.name] = value["value"] if value else None
+
+    for relationship in relationships:
+        value = node.get(relationship.name)
+        if relationship.cardinality == "one":
+            row[relationship.name] = peer_to_string(value["node"]) if value and value.get("node") else None
+        else:
+            edges = value.get("edges", []) if value else []
+            row[relationship.name] = [peer_to_string(edge["node"]) for edge in edges]
+    return row
+
+
+def column_dtypes(schema: MainSchemaTypes, columns: list[str] | None = None) -> dict[str, str]:
+    """Return the pandas dtype of the exported attributes that have one, derived from their kind."""
+    attributes, _ = select_fields(schema=schema, columns=columns)
+    dtypes: dict[str, str] = {}
+    for attribute in attributes:
+        dtype = "category" if attribute.enum else ATTRIBUTE_KIND_DTYPES.get(attribute.kind)
+        if dtype:
+            dtypes[attribute.name] = dtype
+    return dtypes
+
+
+def build_dataframe(
+    schema: MainSchemaTypes, rows: list[dict[str, Any]], columns: list[str] | None = None
+) -> pd.DataFrame:
+    """Build a DataFrame from export rows, typing the columns from the kinds of the attributes.
+
+    Numbers and booleans use nullable dtypes, dropdowns and enums are categorical and IP addresses
+    and prefixes are converted to strings in a single pass.
+    """
+    return _apply_dtypes(df=pd.DataFrame(rows), schema=schema, columns=columns)
+
+
+def _apply_dtypes(df: pd.DataFrame, schema: MainSchemaTypes, columns: list[str] | None = None) -> pd.DataFrame:
+    dtypes = {name: dtype for name, dtype in column_dtypes(schema=schema, columns=columns).items() if name in df}
+    return df.astype(dtypes)
+
+
+class SavedExport(BaseModel):
+    """An export of a kind keyed by ID, which a delta export brings up to date.
+
+    `since` is the last update time of the objects in the export and `schema_hash` the hash of the schema of
+    the kind when it was exported; a delta export needs both, otherwise every object is fetched again.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    df: pd.DataFrame
+    columns: list[str]
+    schema_hash: str | None
+    since: datetime | None = None
+
+
+def merge_delta(
+    schema: MainSchemaTypes,
+    previous: pd.DataFrame,
+    changed: pd.DataFrame,
+    ids: list[str],
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Merge the changed rows into a previous export on the `index` column, in the order of `ids`.
+
+    Previous rows are replaced by their changed version and objects missing from `ids` are dropped.
+    """
+    merged = pd.concat([previous[~previous["index"].isin(changed["index"])], changed]) if len(changed) else previous
+    merged = merged.set_index("index", drop=False)
+    merged = merged.loc[[object_id for object_id in ids if object_id in merged.index]].reset_index(drop=True)
+    # Categories of the previous and changed rows may differ, which concatenation turns into objects
+    return _apply_dtypes(df=merged, schema=schema, columns=columns)
+
+
+def arrow_schema(schema: MainSchemaTypes, columns: list[str]) -> pa.Schema:
+    """Return the Arrow schema of an export, matching the DataFrame dtypes given by `column_dtypes`."""
+    attributes, relationships = select_fields(schema=schema, columns=columns)
+    dtypes = column_dtypes(schema=schema, columns=columns)
+    types: dict[str, pa.DataType] = {}
+    for attribute in attributes:
+        value_type = {"Int64": pa.int64(), "boolean": pa.bool_()}.get(
+            ATTRIBUTE_KIND_DTYPES.get(attribute.kind, ""), pa.string()
+        )
+        types[attribute.name] = (
+            pa.dictionary(pa.int32(), value_type) if dtypes.get(attribute.name) == "category" else value_type
+        )
+    for relationship in relationships:
+        types[relationship.name] = pa.string() if relationship.cardinality == "one" else pa.list_(pa.string())
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+def to_arrow_table(df: pd.DataFrame, schema: MainSchemaTypes, columns: list[str]) -> pa.Table:
+    """Convert a DataFrame built by `build_dataframe` to an Arrow table with the columns of an export."""
+    df = df.reindex(columns=columns)
+    attributes, _ = select_fields(schema=schema, columns=columns)
+    for attribute in attributes:
+        if attribute.kind in JSON_ATTRIBUTE_KINDS:
+            df[attribute.name] = df[attribute.name].map(json.dumps, na_action="ignore")
+    return pa.Table.from_pandas(df, schema=arrow_schema(schema=schema, columns=columns), preserve_index=False)
+
+
+def dataframe_to_parquet(df: pd.DataFrame, schema: MainSchemaTypes, columns: list[str]) -> bytes:
+    """Serialize the columns of an export DataFrame to a compressed Parquet file."""
+    buffer = io.BytesIO()
+    pq.write_table(to_arrow_table(df=df, schema=schema, columns=columns), buffer, compression=PARQUET_COMPRESSION)
+    return buffer.getvalue()
+
+
+class ExportWriter(ABC):
+    """Write export rows incrementally to a spooled temporary file, keeping the first rows as a preview.
+
+    Columns are typed from the `schema` of the exported kind. Subclasses implement `_write` for a file format.
+    A writer is not thread-safe, but may be called from a worker thread, one call at a time.
+    """
+
+    extension: str
+    mime: str
+    # Whether the format is already compressed, and not worth compressing again in an archive
+    compressed: bool = False
+
+    def __init__(self, columns: list[str], schema: MainSchemaTypes, preview_rows: int = EXPORT_PREVIEW_ROWS) -> None:
+        self.columns = columns
+        self.schema = schema
+        self.dtypes = column_dtypes(schema=schema, columns=columns)
+        self.rows = 0
+        self.preview: list[dict[str, Any]] = []
+        self._preview_rows = preview_rows
+        self._file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)  # noqa: SIM115
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        if len(self.preview) < self._preview_rows:
+            self.preview.extend(rows[: self._preview_rows - len(self.preview)])
+        self._write(rows)
+        self.rows += len(rows)
+
+    @abstractmethod
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        """Write rows to the file, in the format of the writer."""
+
+    def finish(self) -> None:  # noqa: B027
+        """Complete the file once every row has been written, for formats buffering rows or ending with a footer."""
+
+    def preview_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.preview, columns=self.columns).astype(self.dtypes)
+
+    def read(self) -> bytes:
+        self._file.seek(0)
+        return self._file.read()
+
+    def copy_to(self, target: IO[bytes]) -> None:
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, target)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CsvExportWriter(ExportWriter):
+    """Write export rows as CSV, formatted like `DataFrame.to_csv`."""
+
+    extension = "csv"
+    mime = "text/csv"
+
+    def __init__(self, columns: list[str], schema: MainSchemaTypes, preview_rows: int = EXPORT_PREVIEW_ROWS) -> None:
+        super().__init__(columns=columns, schema=schema, preview_rows=preview_rows)
+        self._write_lines([columns])
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        self._write_lines([[row.get(column) for column in self.columns] for row in rows])
+
+    def _write_lines(self, lines: list[list[Any]]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(lines)
+        self._file.write(buffer.getvalue().encode("utf-8"))
+
+
+class ParquetExportWriter(ExportWriter):
+    """Write export rows as a compressed Parquet file, keeping the column types of the schema.
+
+    Rows are buffered and written in row groups of `PARQUET_ROW_GROUP_SIZE` rows.
+    """
+
+    extension = "parquet"
+    mime = "application/vnd.apache.parquet"
+    compressed = True
+
+    def __init__(self, columns: list[str], schema: MainSchemaTypes, preview_rows: int = EXPORT_PREVIEW_ROWS) -> None:
+        super().__init__(columns=columns, schema=schema, preview_rows=preview_rows)
+        self._buffer: list[dict[str, Any]] = []
+        self._writer = pq.ParquetWriter(
+            self._file, arrow_schema(schema=schema, columns=columns), compression=PARQUET_COMPRESSION
+        )
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        self._buffer.extend(rows)
+        if len(self._buffer) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            df = build_dataframe(schema=self.schema, rows=self._buffer, columns=self.columns)
+            self._writer.write_table(to_arrow_table(df=df, schema=self.schema, columns=self.columns))
+            self._buffer = []
+
+    def finish(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+# Export writers by file format
+EXPORT_WRITERS: dict[str, type[ExportWriter]] = {
+    CsvExportWriter.extension: CsvExportWriter,
+    ParquetExportWriter.extension: ParquetExportWriter,
+}
+
+
+def export_columns(schema: MainSchemaTypes) -> list[str]:
+    """Return every exportable column of a kind, attributes first."""
+    return [*schema.attribute_names, *schema.relationship_names]
+
+
+class ExportArchive:
+    """Zip archive of export files, one per kind, described by a `manifest.json` file.
+
+    Files are compressed by `add`, which may run in a worker thread but never concurrently with another call.
+    """
+
+    mime = "application/zip"
+
+    def __init__(self, address: str, branch: str | None, file_format: str) -> None:
+        self.manifest: dict[str, Any] = {
+            "address": address,
+            "branch": branch,
+            "format": file_format,
+            "exported_at": datetime.now(tz=timezone.utc).isoformat(),
+            "kinds": [],
+        }
+        self._file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)  # noqa: SIM115
+        self._zip = zipfile.ZipFile(self._file, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, kind: str, writer: ExportWriter, seconds: float) -> None:
+        """Add the finished export file of a kind to the archive."""
+        info = zipfile.ZipInfo(
+            filename=f"{kind}.{writer.extension}", date_time=datetime.now(tz=timezone.utc).timetuple()[:6]
+        )
+        info.compress_type = zipfile.ZIP_STORED if writer.compressed else zipfile.ZIP_DEFLATED
+        with self._zip.open(info, mode="w") as target:
+            writer.copy_to(target)
+        self.manifest["kinds"].append(
+            {"kind": kind, "file": info.filename, "rows": writer.rows, "seconds": round(seconds, 3)}
+        )
+
+    def add_error(self, kind: str, error: str) -> None:
+        """Record in the manifest a kind that could not be exported."""
+        self.manifest["kinds"].append({"kind": kind, "file": None, "rows": None, "error": error})
+
+    def finish(self) -> None:
+        self._zip.writestr("manifest.json", json.dumps(self.manifest, indent=2))
+        self._zip.close()
+
+    def read(self) -> bytes:
+        self._file.seek(0)
+        return self._file.read()
+
+    def close(self) -> None:
+        self._zip.close()
+        self._file.close()
@@ -1,7 +1,9 @@
-from graphql import GraphQLList, GraphQLNonNull, GraphQLObjectType, build_client_schema, get_introspection_query
+from typing import cast
+
+from graphql import GraphQLList, GraphQLNonNull, GraphQLObjectType, IntrospectionQuery, build_client_schema
 from langchain.tools import tool
 
-from emma.infrahub import run_gql_query
+from emma.infrahub import get_graphql_introspection
 
 EXCLUDED_TYPES = (
     "id",
@@ -23,11 +25,10 @@ EXCLUDED_TYPES = (
 
 
 def get_gql_schema(branch: str | None = None) -> GraphQLObjectType | None:
-    schema_query = get_introspection_query()
-    introspection_result = run_gql_query(query=schema_query, branch=branch)
+    introspection_result = get_graphql_introspection(branch=branch)
 
     if introspection_result:
-        schema = build_client_schema(introspection=introspection_result)
+        schema = build_client_schema(introspection=cast("IntrospectionQuery", introspection_result))
         return schema.query_type  # Return the root query object directly
 
     return None
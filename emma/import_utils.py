@@ -0,0 +1,224 @@
+"""Import utils: collect the related nodes referenced in an import file and build the queries resolving them."""
+
+import os
+import re
+from collections.abc import Iterable
+from typing import Any
+
+import pandas as pd
+from infrahub_sdk.graphql import Query
+from infrahub_sdk.graphql.renderers import render_input_block, render_query_block, render_variables_to_string
+from infrahub_sdk.schema import MainSchemaTypes
+from pydantic import BaseModel
+
+from emma.utils import is_uuid, parse_hfid
+
+# A related node referenced by kind and human friendly ID
+Reference = tuple[str, tuple[str, ...]]
+
+# Number of aliased lookups sent in a single query
+HFID_LOOKUPS_PER_QUERY = 50
+# Kinds with at most this many objects have their whole HFID to ID index fetched instead of being looked up
+HFID_INDEX_MAX_OBJECTS = 5000
+
+# Objects upserted by a single aliased mutation, 1 saving every object with its own request
+IMPORT_OBJECTS_PER_REQUEST = int(os.environ.get("EMMA_IMPORT_OBJECTS_PER_REQUEST", "1"))
+# Maximum number of objects saved concurrently by an import
+IMPORT_MAX_IN_FLIGHT = int(os.environ.get("EMMA_IMPORT_MAX_IN_FLIGHT", "10"))
+# Seconds between two progress reports of an import
+IMPORT_PROGRESS_INTERVAL = 0.5
+# Rows of a streamed import read, preprocessed and saved at a time
+IMPORT_CHUNK_SIZE = int(os.environ.get("EMMA_IMPORT_CHUNK_SIZE", "1000"))
+# Chunks waiting between two stages of a streamed import, which bounds the memory it uses
+IMPORT_QUEUE_SIZE = 2
+# Number of rows of a streamed import displayed before it starts
+IMPORT_PREVIEW_ROWS = 100
+# Errors of a streamed import kept to be displayed, the others are only counted
+IMPORT_MAX_REPORTED_ERRORS = 100
+# Cell values meaning that there is no value
+EMPTY_VALUES = ["[]", "", '""']
+
+# A single or double quoted item of a list-like cell
+QUOTED_ITEM = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+# The alias of the n-th object of an aliased upsert mutation
+UPSERT_ALIAS = re.compile(r"^upsert(\d+)$")
+
+
+def is_list_cell(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("[") and value.endswith("]")
+
+
+def split_cell(value: Any) -> list[Any]:
+    """Return the items of a relationship cell: the items of a list-like string, or the value itself.
+
+    List-like strings are parsed without being evaluated, their items being quoted or separated by commas.
+    """
+    if not is_list_cell(value):
+        return [value]
+    inner = value[1:-1]
+    if "'" in inner or '"' in inner:
+        return [single or double for single, double in QUOTED_ITEM.findall(inner)]
+    return [item.strip() for item in inner.split(",") if item.strip()]
+
+
+def parse_reference(item: str, peer_kind: str) -> Reference | None:
+    """Parse an item referencing a related node as `<kind>__<hfid>`, or as a bare HFID of the peer kind.
+
+    Returns None for an ID, which needs no resolution.
+    """
+    if is_uuid(item):
+        return None
+    hfid = parse_hfid(hfid=item)
+    if len(hfid) == 1:
+        return peer_kind, (item,)
+    return hfid[0], tuple(hfid[1:])
+
+
+def resolve_item(item: Any, peer_kind: str, resolved: dict[Reference, str]) -> Any:
+    """Replace an item referencing a related node by HFID with its resolved ID, keeping IDs and unknown HFIDs."""
+    reference = parse_reference(item=item, peer_kind=peer_kind) if isinstance(item, str) else None
+    if reference is None:
+        return item
+    return resolved.get(reference, item)
+
+
+def resolve_cell(value: Any, peer_kind: str, resolved: dict[Reference, str]) -> Any:
+    """Replace the related nodes referenced by HFID in a relationship cell with their resolved IDs."""
+    items = [resolve_item(item=item, peer_kind=peer_kind, resolved=resolved) for item in split_cell(value)]
+    return items if is_list_cell(value) else items[0]
+
+
+def preprocess_dataframe(df: pd.DataFrame, schema: MainSchemaTypes, resolved: dict[Reference, str]) -> pd.DataFrame:
+    """Keep the columns of an import file mapped to the schema, with related nodes referenced by ID.
+
+    Columns are classified once from the schema, and each relationship column is converted one distinct
+    value at a time, so that the cost depends on the number of distinct references rather than of rows.
+    Columns without any value are dropped.
+    """
+    attribute_names = set(schema.attribute_names)
+    peer_kinds = {relationship.name: relationship.peer for relationship in schema.relationships}
+    columns: dict[str, pd.Series] = {}
+    for column in df.columns:
+        if column in peer_kinds:
+            values = df[column]
+            conversions = {
+                value: resolve_cell(value=value, peer_kind=peer_kinds[column], resolved=resolved)
+                for value in values.dropna().unique()
+            }
+            columns[column] = values.map(conversions)
+        elif column in attribute_names:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index).dropna(axis=1, how="all")
+
+
+def collect_references(df: pd.DataFrame, schema: MainSchemaTypes) -> dict[str, set[tuple[str, ...]]]:
+    """Return the distinct HFIDs referenced in the relationship columns of an import file, by kind."""
+    references: dict[str, set[tuple[str, ...]]] = {}
+    peer_kinds = {relationship.name: relationship.peer for relationship in schema.relationships}
+    for column in df.columns:
+        if column not in peer_kinds:
+            continue
+        for value in df[column].dropna().unique():
+            for item in split_cell(value):
+                reference = parse_reference(item=item, peer_kind=peer_kinds[column]) if isinstance(item, str) else None
+                if reference:
+                    references.setdefault(reference[0], set()).add(reference[1])
+    return references
+
+
+def build_hfid_lookup_query(kind: str, hfids: Iterable[tuple[str, ...]]) -> str:
+    """Build a query looking up the ID of several objects of a kind by HFID, one aliased field per HFID.
+
+    The object of the n-th HFID is returned under the `hfid<n>` alias.
+    """
+    lines = ["query {"]
+    for index, hfid in enumerate(hfids):
+        lines.extend(
+            render_query_block(
+                data={
+                    kind: {"@alias": f"hfid{index}", "@filters": {"hfid": list(hfid)}, "edges": {"node": {"id": None}}}
+                }
+            )
+        )
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def build_hfid_index_query(kind: str, offset: int, limit: int) -> str:
+    """Build a query returning one page of the IDs and HFIDs of the objects of a kind."""
+    query = Query(
+        query={
+            kind: {
+                "@filters": {"offset": offset, "limit": limit},
+                "count": None,
+                "edges": {"node": {"id": None, "hfid": None}},
+            }
+        }
+    )
+    return str(query.render())
+
+
+def build_upsert_mutation(kind: str, inputs: list[dict[str, Any]]) -> tuple[str, dict[str, Any]]:
+    """Build a mutation upserting several objects of a kind, one aliased `<kind>Upsert` field per object.
+
+    `inputs` are the input data generated by the SDK for each node, and the n-th object is upserted under
+    the `upsert<n>` alias. Returns the mutation with the variables it uses.
+    """
+    variables: dict[str, Any] = {}
+    variable_types: dict[str, Any] = {}
+    lines = []
+    for index, input_data in enumerate(inputs):
+        variables.update(input_data["variables"])
+        variable_types.update(input_data["mutation_variables"])
+        lines.append(f"    upsert{index}: {kind}Upsert(")
+        lines.extend(render_input_block(data=input_data["data"], offset=8))
+        lines.append("    ){")
+        lines.extend(render_query_block(data={"ok": None, "object": {"id": None}}, offset=8))
+        lines.append("    }")
+    first_line = f"mutation ({render_variables_to_string(variable_types)}) {{" if variable_types else "mutation {"
+    return "\n".join([first_line, *lines, "}"]), variables
+
+
+def map_upsert_errors(errors: list[dict[str, Any]]) -> dict[int, str] | None:
+    """Map the errors of an aliased upsert mutation to the position of the object they belong to.
+
+    Returns None if an error doesn't belong to an object, the mutation having then been rejected as a whole.
+    """
+    failures: dict[int, str] = {}
+    for error in errors:
+        path = error.get("path") or [None]
+        match = UPSERT_ALIAS.match(str(path[0]))
+        if match is None:
+            return None
+        failures.setdefault(int(match.group(1)), error.get("message", str(error)))
+    return failures
+
+
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the cells of an import file meaning that there is no value with NaN."""
+    return df.mask(df.isin(EMPTY_VALUES))
+
+
+def row_to_data(row: dict[str, Any]) -> dict[str, Any]:
+    """Return the data of an object to import from a preprocessed row, without its empty cells."""
+    return {key: value for key, value in row.items() if not isinstance(value, float) or pd.notnull(value)}
+
+
+class ImportProgress(BaseModel):
+    """Progress of a streamed import, with the first `IMPORT_MAX_REPORTED_ERRORS` errors."""
+
+    rows_read: int = 0
+    rows_saved: int = 0
+    rows_failed: int = 0
+    errors: list[str] = []
+    # Error which stopped the import, the rows after it are not imported
+    error: str | None = None
+    done: bool = False
+
+    def add_error(self, message: str) -> None:
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def add_failure(self, index: Any, error: Exception | str) -> None:
+        self.rows_failed += 1
+        self.add_error(f"Line {index}: {error}")
@@ -1,13 +1,27 @@
 import asyncio
 import concurrent.futures
+import contextlib
+import contextvars
+import gzip
+import hashlib
+import json
 import os
+import queue
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable, Coroutine, MutableMapping
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from functools import wraps
+from functools import partial, wraps
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, List, Tuple
+from typing import TYPE_CHECKING, Any, List, Tuple, TypeVar, cast, overload
+from urllib.parse import quote, urlencode
 
+import httpx
 import pandas as pd
 import streamlit as st
+from graphql import get_introspection_query
 from httpx import HTTPError, HTTPStatusError
 from infrahub_sdk import Config, InfrahubClient
 from infrahub_sdk.batch import InfrahubBatch
@@ -25,13 +39,82 @@ from infrahub_sdk.node import (
     RelationshipManager,
 )
 from infrahub_sdk.schema import GenericSchema, MainSchemaTypes, NodeSchema, SchemaLoadResponse
-from infrahub_sdk.types import Order
+from infrahub_sdk.schema.main import BranchSchema
+from infrahub_sdk.timestamp import Timestamp
+from infrahub_sdk.types import HTTPMethod, Order
 from infrahub_sdk.yaml import SchemaFile
 from pydantic import BaseModel
 
+from emma.cache_utils import PartitionedCache, SingleFlight
+from emma.concurrency_utils import ConcurrencyLimiter, ConcurrencyStats
+from emma.export_utils import (
+    EXPORT_WRITERS,
+    ExportArchive,
+    ExportWriter,
+    SavedExport,
+    build_dataframe,
+    build_projection_query,
+    build_updates_query,
+    export_columns,
+    merge_delta,
+    node_to_row,
+)
+from emma.import_utils import (
+    HFID_INDEX_MAX_OBJECTS,
+    HFID_LOOKUPS_PER_QUERY,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_OBJECTS_PER_REQUEST,
+    IMPORT_PROGRESS_INTERVAL,
+    IMPORT_QUEUE_SIZE,
+    ImportProgress,
+    Reference,
+    build_hfid_index_query,
+    build_hfid_lookup_query,
+    build_upsert_mutation,
+    clean_chunk,
+    collect_references,
+    map_upsert_errors,
+    preprocess_dataframe,
+    row_to_data,
+)
+
 if TYPE_CHECKING:
     from infrahub_sdk.node import Attribute
 
+CLIENT_TIMEOUT = 60
+# Synchronous calls made by the pages are given up after this many seconds, so a hung request can't block them
+SYNC_CALL_TIMEOUT = float(os.environ.get("EMMA_SYNC_CALL_TIMEOUT", "120"))
+# Same for bulk imports and exports, which take as long as the amount of data they move
+BULK_CALL_TIMEOUT = float(os.environ.get("EMMA_BULK_CALL_TIMEOUT", "3600"))
+SCRIPT_THREAD_POLL_INTERVAL = 0.1
+# A server that answered within this many seconds is considered reachable without probing it again
+HEALTH_TTL = float(os.environ.get("EMMA_HEALTH_TTL", "30"))
+CIRCUIT_BACKOFF_BASE = 2.0
+CIRCUIT_BACKOFF_MAX = 60.0
+# A cached schema is checked against the server's schema hash at most this often
+SCHEMA_REVALIDATE_INTERVAL = float(os.environ.get("EMMA_SCHEMA_REVALIDATE_INTERVAL", "10"))
+# Optional directory where schema snapshots are persisted to warm-start the schema cache
+SCHEMA_CACHE_DIR = os.environ.get("EMMA_SCHEMA_CACHE_DIR")
+SCHEMA_SNAPSHOTS_KEPT = 3
+# Optional directory where point-in-time exports are persisted, they never change so they are kept indefinitely
+EXPORT_CACHE_DIR = os.environ.get("EMMA_EXPORT_CACHE_DIR")
+# Point-in-time exports are only persisted once they are this many seconds old, when no change can still land
+POINT_IN_TIME_MIN_AGE = 60
+# The branch list shown in the sidebar is refreshed at most this often, or when a branch is created
+BRANCH_CACHE_TTL = float(os.environ.get("EMMA_BRANCH_CACHE_TTL", "30"))
+# Memory budget, in bytes, of the data cached for the pages, least recently used entries are evicted first
+OBJECTS_CACHE_MAX_SIZE = int(os.environ.get("EMMA_OBJECTS_CACHE_MAX_SIZE", str(512 * 1024 * 1024)))
+# Data cached for the pages is fetched again at least this often
+OBJECTS_CACHE_TTL = float(os.environ.get("EMMA_OBJECTS_CACHE_TTL", "3600"))
+# Maximum number of concurrent requests made by an export, to resolve related nodes or fetch the pages of a bulk export
+EXPORT_CONCURRENCY = int(os.environ.get("EMMA_EXPORT_CONCURRENCY", "10"))
+# Connection pools unused for this many seconds, with no request in flight, are closed when clients are evicted
+POOL_IDLE_TIMEOUT = float(os.environ.get("EMMA_POOL_IDLE_TIMEOUT", "300"))
+# The caches of an instance are dropped once this many reachability probes in a row have failed
+CACHE_INVALIDATION_FAILURES = int(os.environ.get("EMMA_CACHE_INVALIDATION_FAILURES", "3"))
+
+T = TypeVar("T")
+
 
 class InfrahubStatus(str, Enum):
     UNKNOWN = "unknown"
@@ -50,46 +133,150 @@ class FileNotValidError(Exception):
         super().__init__(self.message)
 
 
-def run_async(func: Any) -> Any:
-    """Decorator to run async functions synchronously.
+# Streamlit calls made from the background loop are queued here and replayed on the script thread
+_SCRIPT_THREAD_CALLS: contextvars.ContextVar[queue.SimpleQueue | None] = contextvars.ContextVar(
+    "_SCRIPT_THREAD_CALLS", default=None
+)
+
+
+class BackgroundLoop:
+    """A single long-lived event loop, running in a daemon thread and shared by the whole process.
 
-    This decorator handles running async functions in various contexts:
-    - When no event loop exists: uses asyncio.run()
-    - When an event loop exists but isn't running: uses run_until_complete()
-    - When an event loop is running (e.g., Streamlit): creates a new event loop in a thread
+    Coroutines are submitted from Streamlit script threads; the pooled clients and their
+    keep-alive connections all live on this one loop.
     """
 
-    @wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="emma-event-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def is_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        """Schedule a coroutine without waiting for it; the returned future can be cancelled."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run a coroutine on the loop and block until it completes.
+
+        Streamlit calls queued by the coroutine are replayed on the calling thread while waiting.
+        On timeout, or if the caller is interrupted, the coroutine is cancelled.
+        """
+        if self.is_loop_thread():
+            coro.close()
+            raise RuntimeError("Cannot block on the background event loop from within itself")
+
+        calls: queue.SimpleQueue = queue.SimpleQueue()
+        future = self.submit(_with_script_thread_calls(coro, calls))
+        deadline = None if timeout is None else time.monotonic() + timeout
         try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # No event loop exists, safe to use asyncio.run
-            return asyncio.run(func(*args, **kwargs))
+            while True:
+                done, _ = concurrent.futures.wait([future], timeout=SCRIPT_THREAD_POLL_INTERVAL)
+                _replay_script_thread_calls(calls)
+                if done:
+                    return future.result()
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Call to Infrahub did not complete within {timeout}s")
+        finally:
+            future.cancel()
+
+
+async def _with_script_thread_calls(coro: Coroutine[Any, Any, T], calls: queue.SimpleQueue) -> T:
+    _SCRIPT_THREAD_CALLS.set(calls)
+    return await coro
+
+
+def _replay_script_thread_calls(calls: queue.SimpleQueue) -> None:
+    while True:
+        try:
+            call = calls.get_nowait()
+        except queue.Empty:
+            return
+        call()
+
+
+_BACKGROUND_LOOP = BackgroundLoop()
+# Strong references to fire-and-forget tasks, so that they are not garbage collected while running
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+def spawn_background_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Start a coroutine on the running loop without waiting for it."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
+
+
+def call_in_script_thread(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Call a Streamlit function, deferring it to the script thread when running on the background loop."""
+    calls = _SCRIPT_THREAD_CALLS.get()
+    if calls is None:
+        func(*args, **kwargs)
+    else:
+        calls.put(partial(func, *args, **kwargs))
 
-        if loop.is_running():
-            # Event loop is running (common in Streamlit)
-            # We cannot use run_coroutine_threadsafe as it requires the loop
-            # to be running in a different thread and actively processing.
-            # Instead, create a new event loop in a separate thread.
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, func(*args, **kwargs))
-                return future.result(timeout=120)  # 2 minute timeout
 
-        return loop.run_until_complete(func(*args, **kwargs))
+def _set_session_state(values: dict[str, Any]) -> None:
+    for key, value in values.items():
+        st.session_state[key] = value
 
-    return wrapper
+
+def update_session_state(**values: Any) -> None:
+    """Update `st.session_state`, safely from both the script thread and the background loop."""
+    call_in_script_thread(_set_session_state, values)
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: float | None = SYNC_CALL_TIMEOUT) -> T:
+    """Run a coroutine on the shared background loop and return its result, within `timeout` seconds."""
+    return _BACKGROUND_LOOP.run(coro, timeout=timeout)
+
+
+@overload
+def run_async(func: Callable[..., Coroutine[Any, Any, T]]) -> Callable[..., T]: ...
+
+
+@overload
+def run_async(*, timeout: float | None) -> Callable[[Callable[..., Coroutine[Any, Any, T]]], Callable[..., T]]: ...
+
+
+def run_async(
+    func: Callable[..., Coroutine[Any, Any, T]] | None = None, *, timeout: float | None = SYNC_CALL_TIMEOUT
+) -> Callable[..., T] | Callable[[Callable[..., Coroutine[Any, Any, T]]], Callable[..., T]]:
+    """Decorator to run async functions synchronously, used as `@run_async` or `@run_async(timeout=...)`.
+
+    The coroutine is executed on the shared background event loop (see `BackgroundLoop`),
+    so no thread or event loop is created per call. It is cancelled if it doesn't complete within
+    `timeout` seconds, `SYNC_CALL_TIMEOUT` by default.
+    """
+
+    def decorator(func: Callable[..., Coroutine[Any, Any, T]]) -> Callable[..., T]:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            return run_sync(func(*args, **kwargs), timeout=timeout)
+
+        return wrapper
+
+    return decorator if func is None else decorator(func)
 
 
 def is_current_schema_empty() -> bool:
     """Check if the current schema is empty (only default namespaces)."""
     DEFAULT_NAMESPACES = ["Core", "Profile", "Builtin", "Ipam", "Lineage"]
 
-    # FIXME: Here the fact that the schema is cached creates issue
-    # e.g. if I trash the schema on Infrahub side I need to reboot emma for this to be taken into account...
     branch: str = get_instance_branch() or "main"
-    schema: dict[str, Any] | None = fetch_schema(branch)
-    # FIXME: Here the fact that the schema is cached creates issue
+    schema: dict[str, Any] | None = get_schema(branch)
 
     result: bool = True
 
@@ -117,43 +304,70 @@ def get_instance_branch() -> str | None:
     return str(st.session_state.infrahub_branch) if st.session_state.infrahub_branch else None
 
 
-async def convert_node_to_dict(obj: InfrahubNode, include_id: bool = True) -> dict[str, Any]:
+class PeerResolver:
+    """Resolve related nodes to the reference used in exports, `<kind>__<hfid>` or their ID.
+
+    Each peer is looked up once however many nodes relate to it, and at most `concurrency` requests
+    to Infrahub run at the same time.
+    """
+
+    def __init__(self, client: InfrahubClient, concurrency: int) -> None:
+        self.client = client
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._references: dict[str, asyncio.Future[str]] = {}
+
+    async def fetch(self, rel: RelatedNode | RelationshipManager) -> None:
+        async with self._semaphore:
+            await rel.fetch()
+
+    def resolve(self, peer: RelatedNode) -> asyncio.Future[str]:
+        reference = self._references.get(peer.id)
+        if reference is None:
+            reference = asyncio.ensure_future(self._resolve(peer))
+            self._references[peer.id] = reference
+        return reference
+
+    async def _resolve(self, peer: RelatedNode) -> str:
+        # The store avoids a request for peers already fetched, e.g. by a relationship manager
+        related_node = self.client.store.get(key=peer.id, raise_when_missing=False)
+        if not related_node:
+            await self.fetch(peer)
+            related_node = peer.peer
+        if related_node.hfid:
+            return str(related_node.get_human_friendly_id_as_string(include_kind=True))
+        return str(related_node.id)
+
+
+async def convert_node_to_dict(
+    obj: InfrahubNode,
+    include_id: bool = True,
+    resolver: PeerResolver | None = None,
+    columns: list[str] | None = None,
+) -> dict[str, Any]:
     data = {}
+    resolver = resolver or PeerResolver(client=obj._client, concurrency=EXPORT_CONCURRENCY)
 
     if include_id:
         data["index"] = obj.id or None
 
     for attr_name in obj._schema.attribute_names:
+        if columns is not None and attr_name not in columns:
+            continue
         attr: Attribute = getattr(obj, attr_name)
         data[attr_name] = attr.value
 
     for rel_name in obj._schema.relationship_names:
+        # Skipping a relationship also skips fetching its peers
+        if columns is not None and rel_name not in columns:
+            continue
         rel = getattr(obj, rel_name)
         if rel and isinstance(rel, RelatedNode):
             if rel.initialized:
-                await rel.fetch()
-                related_node = obj._client.store.get(key=rel.peer.id, raise_when_missing=False)
-                data[rel_name] = (
-                    related_node.get_human_friendly_id_as_string(include_kind=True)
-                    if related_node.hfid
-                    else related_node.id
-                )
+                data[rel_name] = await resolver.resolve(rel)
         elif rel and isinstance(rel, RelationshipManager):
-            peers: List[dict[str, Any]] = []
             if not rel.initialized:
-                await rel.fetch()
-            for peer in rel.peers:
-                # FIXME: We are using the store to avoid doing to many queries to Infrahub
-                # but we could end up doing store+infrahub if the store is not populated
-                related_node = obj._client.store.get(key=peer.id, raise_when_missing=False)
-                if not related_node:
-                    await peer.fetch()
-                    related_node = peer.peer
-                peers.append(
-                    related_node.get_human_friendly_id_as_string(include_kind=True)
-                    if related_node.hfid
-                    else related_node.id
-                )
+                await resolver.fetch(rel)
+            peers: List[str] = await asyncio.gather(*(resolver.resolve(peer) for peer in rel.peers))
             data[rel_name] = peers
     return data
 
@@ -270,41 +484,416 @@ def dict_to_df(data: dict[str, Any]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Dat
     return main_info_df, attributes_df, relationships_df
 
 
+class InfrahubHealth:
+    """Reachability state of one Infrahub address, shared by every session.
+
+    Any successful response marks the server healthy for `HEALTH_TTL` seconds. Failed probes open
+    a circuit breaker: further checks fail fast until an exponential backoff delay has elapsed.
+    """
+
+    def __init__(self) -> None:
+        self.last_success: float | None = None
+        self.failures: int = 0
+        self.open_until: float = 0.0
+        self.error_message: str = ""
+
+    def is_healthy(self, now: float) -> bool:
+        return self.last_success is not None and now - self.last_success < HEALTH_TTL
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def record_success(self) -> None:
+        self.last_success = time.monotonic()
+        self.failures = 0
+        self.open_until = 0.0
+        self.error_message = ""
+
+    def record_failure(self, message: str) -> None:
+        self.last_success = None
+        self.failures += 1
+        self.open_until = time.monotonic() + min(CIRCUIT_BACKOFF_BASE * 2 ** (self.failures - 1), CIRCUIT_BACKOFF_MAX)
+        self.error_message = message
+
+    def mark_unhealthy(self) -> None:
+        """Forget the last success so that the next check probes the server again."""
+        self.last_success = None
+
+
+_HEALTH: dict[str, InfrahubHealth] = {}
+_HEALTH_LOCK = threading.Lock()
+
+
+# Identical requests in flight at the same time (e.g. many sessions loading the same schema) share one call
+_IN_FLIGHT = SingleFlight()
+
+
+def _request_key(client: InfrahubClient, *parts: Any) -> tuple[Any, ...]:
+    """Key identifying an upstream request: same server, same credentials, same operation and arguments."""
+    return (client.address, client.config.api_token, *parts)
+
+
+def get_health(address: str) -> InfrahubHealth:
+    """Return the reachability state of an Infrahub address."""
+    with _HEALTH_LOCK:
+        return _HEALTH.setdefault(address, InfrahubHealth())
+
+
+class PooledRequester:
+    """SDK requester that keeps one keep-alive httpx connection pool per event loop.
+
+    The SDK default requester opens (and TLS-handshakes) a brand new `httpx.AsyncClient` for every
+    request. httpx pools are bound to the loop that created them, hence one pool per loop.
+    Requests in flight are counted, so that pools shared by several sessions are only closed when idle.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    def _get_pool(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is None or pool.is_closed:
+                proxy_config: dict[str, Any] = {"proxy": None, "mounts": None}
+                if self.config.proxy:
+                    proxy_config["proxy"] = self.config.proxy
+                elif self.config.proxy_mounts.is_set:
+                    proxy_config["mounts"] = {
+                        key: httpx.AsyncHTTPTransport(proxy=value)
+                        for key, value in self.config.proxy_mounts.model_dump(by_alias=True).items()
+                    }
+                pool = httpx.AsyncClient(**proxy_config, verify=self.config.tls_context)
+                self._pools[loop] = pool
+        return pool
+
+    async def __call__(
+        self,
+        url: str,
+        method: HTTPMethod,
+        headers: dict[str, Any],
+        timeout: int,
+        payload: dict | None = None,
+    ) -> httpx.Response:
+        params: dict[str, Any] = {"json": payload} if payload else {}
+        health = get_health(self.config.address)
+        # Counted before the pool is taken, so that a pool can't be closed while a request uses it
+        with self._lock:
+            self.in_flight += 1
+        try:
+            response = await self._get_pool().request(
+                method=method.value, url=url, headers=headers, timeout=timeout, **params
+            )
+        except httpx.NetworkError as exc:
+            health.mark_unhealthy()
+            raise ServerNotReachableError(address=self.config.address) from exc
+        except httpx.ReadTimeout as exc:
+            health.mark_unhealthy()
+            raise ServerNotResponsiveError(url=url, timeout=timeout) from exc
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.last_used = time.monotonic()
+
+        if response.status_code in {502, 503, 504}:
+            health.mark_unhealthy()
+        else:
+            health.record_success()
+        return response
+
+    def detach_pools(
+        self, max_idle: float | None = None
+    ) -> list[tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] | None:
+        """Forget the pools and return them, or None if `max_idle` is set and they were used more recently."""
+        with self._lock:
+            if max_idle is not None and (self.in_flight or time.monotonic() - self.last_used < max_idle):
+                return None
+            pools = list(self._pools.items())
+            self._pools.clear()
+        return pools
+
+
+def _close_pools(pools: list[tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]]) -> None:
+    for loop, pool in pools:
+        if loop.is_closed():
+            continue
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+        else:
+            loop.run_until_complete(pool.aclose())
+
+
+# Pooled clients keyed by (address, branch, token), sharing one requester per (address, token)
+_CLIENTS: dict[tuple[str, str, str | None], InfrahubClient] = {}
+_REQUESTERS: dict[tuple[str, str | None], PooledRequester] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
 async def get_client_async(address: str | None = None, branch: str | None = None) -> InfrahubClient:
+    """Return the pooled client for this address, branch and API token, creating it on first use."""
+    config_args: dict[str, Any] = {"timeout": CLIENT_TIMEOUT}
+    if address:
+        config_args["address"] = address
     if branch:
-        return InfrahubClient(address=address, config=Config(timeout=60, default_branch=branch))
-    return InfrahubClient(address=address, config=Config(timeout=60))
+        config_args["default_branch"] = branch
+    settings = Config(**config_args)
+    key = (settings.address, settings.default_branch, settings.api_token)
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            requester = _REQUESTERS.get((settings.address, settings.api_token))
+            if requester is None:
+                requester = PooledRequester(config=settings)
+                _REQUESTERS[settings.address, settings.api_token] = requester
+            client = InfrahubClient(config=Config(**config_args, requester=requester))
+            _CLIENTS[key] = client
+    return client
+
+
+def close_idle_clients(max_idle: float = POOL_IDLE_TIMEOUT) -> int:
+    """Drop the pooled clients whose connections haven't been used for `max_idle` seconds and close them.
+
+    Pools with requests in flight are kept, so that sessions still using an address are not disturbed.
+    Returns the number of connection pools closed.
+    """
+    closed: list[tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = []
+    with _CLIENTS_LOCK:
+        for requester_key, requester in list(_REQUESTERS.items()):
+            pools = requester.detach_pools(max_idle=max_idle)
+            if pools is None:
+                continue
+            del _REQUESTERS[requester_key]
+            for key in [key for key, client in _CLIENTS.items() if client.config.requester is requester]:
+                del _CLIENTS[key]
+            closed.extend(pools)
+    _close_pools(closed)
+    return len(closed)
 
 
-@st.cache_data
-def get_cached_schema(branch: str | None = None) -> dict[str, MainSchemaTypes] | None:
-    return asyncio.run(get_schema_async(branch=branch))
+class SchemaCacheEntry:
+    """Schema of one branch of one Infrahub instance, along with the hash it was fetched for."""
 
+    def __init__(self, schema_hash: str, nodes: MutableMapping[str, MainSchemaTypes]) -> None:
+        self.hash = schema_hash
+        self.nodes = nodes
+        self.checked_at = time.monotonic()
+        self.introspection: dict[str, Any] | None = None
 
-async def get_schema_async(branch: str | None = None, refresh: bool = False) -> dict[str, MainSchemaTypes] | None:
-    """Get schema from Infrahub asynchronously."""
-    client: InfrahubClient = await get_client_async()
-    if await check_reachability_async(client=client):
-        result = await client.schema.all(branch=branch, refresh=refresh)
-        return dict(result) if result else None
-    return None
+
+# Schema cache shared by every session, partitioned by address and branch
+_SCHEMA_CACHE = PartitionedCache()
+
+
+def _schema_snapshot_dir(address: str, branch: str) -> Path | None:
+    if not SCHEMA_CACHE_DIR:
+        return None
+    address_key = hashlib.sha256(address.encode()).hexdigest()[:16]
+    return Path(SCHEMA_CACHE_DIR) / address_key / quote(branch, safe="")
+
+
+def write_schema_snapshot(address: str, branch: str, schema_hash: str, name: str, data: Any) -> None:
+    """Persist a compressed snapshot (`name` is "schema" or "graphql") for a schema hash of a branch.
+
+    Only the most recent `SCHEMA_SNAPSHOTS_KEPT` schema hashes are kept per branch.
+    """
+    directory = _schema_snapshot_dir(address=address, branch=branch)
+    if directory is None or not schema_hash:
+        return
+    # Snapshots are a best-effort optimization, failing to write one must never break a page
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{schema_hash}.{name}.json.gz"
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(gzip.compress(json.dumps(data, separators=(",", ":")).encode("utf-8")))
+        tmp_path.replace(path)
+
+        snapshots = sorted(directory.glob("*.schema.json.gz"), key=lambda item: item.stat().st_mtime, reverse=True)
+        for outdated in snapshots[SCHEMA_SNAPSHOTS_KEPT:]:
+            outdated_hash = outdated.name.split(".", 1)[0]
+            for item in directory.glob(f"{outdated_hash}.*"):
+                item.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def read_schema_snapshot(address: str, branch: str, name: str, schema_hash: str | None = None) -> Any:
+    """Read a snapshot for a schema hash of a branch, or the most recent one if no hash is given."""
+    directory = _schema_snapshot_dir(address=address, branch=branch)
+    if directory is None or not directory.is_dir():
+        return None
+    try:
+        if schema_hash:
+            path = directory / f"{schema_hash}.{name}.json.gz"
+        else:
+            snapshots = sorted(directory.glob(f"*.{name}.json.gz"), key=lambda item: item.stat().st_mtime)
+            if not snapshots:
+                return None
+            path = snapshots[-1]
+        return cast("list[dict[str, Any]]", json.loads(gzip.decompress(path.read_bytes())))
+    except (OSError, ValueError):
+        return None
+
+
+def invalidate_schema_cache(address: str, branch: str | None = None) -> None:
+    """Drop the cached schema of one branch, or of every branch, of an Infrahub instance."""
+    _SCHEMA_CACHE.invalidate(address=address, branch=branch)
+
+
+async def get_schema_hash_async(client: InfrahubClient, branch: str) -> str:
+    """Get the current schema hash of a branch, a much cheaper request than the schema itself."""
+    return await _IN_FLIGHT.do(
+        _request_key(client, "schema_hash", branch), partial(_get_schema_hash, client=client, branch=branch)
+    )
+
+
+async def _get_schema_hash(client: InfrahubClient, branch: str) -> str:
+    response = await client._get(url=f"{client.address}/api/schema/summary?{urlencode([('branch', branch)])}")
+    try:
+        response.raise_for_status()
+    except HTTPStatusError:
+        # An unknown hash never matches a cached one, so the schema is simply fetched again
+        return ""
+    return str(response.json()["main"])
+
+
+async def get_schema_async(
+    branch: str | None = None, refresh: bool = False, address: str | None = None
+) -> dict[str, MainSchemaTypes] | None:
+    """Get the schema of a branch from the shared schema cache.
+
+    A cached schema is revalidated against the server's schema hash at most once every
+    `SCHEMA_REVALIDATE_INTERVAL` seconds (or right away with `refresh`), and downloaded
+    again only if that hash changed.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+
+    branch = branch or client.default_branch
+    entry = _SCHEMA_CACHE.get(address=client.address, branch=branch, key="schema")
+    if entry:
+        if not refresh and time.monotonic() - entry.checked_at < SCHEMA_REVALIDATE_INTERVAL:
+            return dict(entry.nodes)
+        if await get_schema_hash_async(client=client, branch=branch) == entry.hash:
+            entry.checked_at = time.monotonic()
+            return dict(entry.nodes)
+
+    if entry is None and SCHEMA_CACHE_DIR:
+        data = await asyncio.to_thread(read_schema_snapshot, address=client.address, branch=branch, name="schema")
+        if data:
+            # Serve the snapshot right away and check it against the server in the background
+            entry = _set_schema_cache(client=client, branch=branch, data=data)
+            spawn_background_task(_revalidate_schema(client=client, branch=branch, entry=entry))
+            return dict(entry.nodes)
+
+    entry = await _fetch_schema(client=client, branch=branch)
+    return dict(entry.nodes) if entry.nodes else None
+
+
+def _set_schema_cache(client: InfrahubClient, branch: str, data: MutableMapping[str, Any]) -> SchemaCacheEntry:
+    branch_schema = BranchSchema.from_api_response(data=data)
+    client.schema.set_cache(branch_schema, branch=branch)
+    entry = SchemaCacheEntry(schema_hash=branch_schema.hash, nodes=branch_schema.nodes)
+    _SCHEMA_CACHE.set(address=client.address, branch=branch, key="schema", value=entry)
+    return entry
+
+
+async def _fetch_schema(client: InfrahubClient, branch: str) -> SchemaCacheEntry:
+    return await _IN_FLIGHT.do(
+        _request_key(client, "schema", branch), partial(_download_schema, client=client, branch=branch)
+    )
+
+
+async def _download_schema(client: InfrahubClient, branch: str) -> SchemaCacheEntry:
+    response = await client._get(url=f"{client.address}/api/schema?{urlencode([('branch', branch)])}")
+    data = client.schema._parse_schema_response(response=response, branch=branch)
+    entry = _set_schema_cache(client=client, branch=branch, data=data)
+    await asyncio.to_thread(
+        write_schema_snapshot, address=client.address, branch=branch, schema_hash=entry.hash, name="schema", data=data
+    )
+    return entry
+
+
+async def _revalidate_schema(client: InfrahubClient, branch: str, entry: SchemaCacheEntry) -> None:
+    try:
+        if await get_schema_hash_async(client=client, branch=branch) == entry.hash:
+            entry.checked_at = time.monotonic()
+        else:
+            await _fetch_schema(client=client, branch=branch)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Let the next foreground call revalidate the snapshot instead
+        entry.checked_at = float("-inf")
+
+
+def get_schema(branch: str | None = None, refresh: bool = False) -> dict[str, MainSchemaTypes] | None:
+    """Get the schema of a branch of the current Infrahub instance, from the shared schema cache."""
+    return run_sync(get_schema_async(branch=branch, refresh=refresh, address=get_instance_address()))
+
+
+async def get_graphql_introspection_async(branch: str | None = None, address: str | None = None) -> dict[str, Any]:
+    """Get the GraphQL introspection of a branch, cached and snapshotted along with its schema hash."""
+    client: InfrahubClient = await get_client_async(address=address)
+    branch = branch or client.default_branch
+    if await get_schema_async(branch=branch, address=address) is None:
+        return {}
+    entry: SchemaCacheEntry | None = _SCHEMA_CACHE.get(address=client.address, branch=branch, key="schema")
+    if entry is None:
+        return {}
+
+    if entry.introspection is None and SCHEMA_CACHE_DIR:
+        snapshot = await asyncio.to_thread(
+            read_schema_snapshot, address=client.address, branch=branch, name="graphql", schema_hash=entry.hash
+        )
+        entry.introspection = cast("dict[str, Any] | None", snapshot)
+    if entry.introspection is None:
+        try:
+            result = await _IN_FLIGHT.do(
+                _request_key(client, "graphql_introspection", branch),
+                partial(client.execute_graphql, get_introspection_query(), branch_name=branch),
+            )
+        except (HTTPStatusError, GraphQLError):
+            return {}
+        entry.introspection = dict(result)
+        await asyncio.to_thread(
+            write_schema_snapshot,
+            address=client.address,
+            branch=branch,
+            schema_hash=entry.hash,
+            name="graphql",
+            data=entry.introspection,
+        )
+    return entry.introspection
+
+
+def get_graphql_introspection(branch: str | None = None) -> dict[str, Any]:
+    """Get the GraphQL introspection of a branch of the current Infrahub instance."""
+    return run_sync(get_graphql_introspection_async(branch=branch, address=get_instance_address()))
 
 
 @run_async
-async def create_and_save(kind: str, data: dict[str, Any], branch: str) -> InfrahubNode | None:
+async def create_and_save(
+    kind: str, data: dict[str, Any], branch: str, address: str | None = None
+) -> InfrahubNode | None:
     """Create and save a node to Infrahub."""
     node = None
-    client: InfrahubClient = await get_client_async()
+    client: InfrahubClient = await get_client_async(address=address)
     if await check_reachability_async(client=client):
         try:
             node = await client.create(kind=kind, branch=branch, **data)
             await node.save(allow_upsert=True)
-            st.success(f"{node.id} created with success (with {data})")
+            call_in_script_thread(st.success, f"{node.id} created with success (with {data})")
         except ValueError as exc:
-            st.error(f"Failed to create: [{kind}] '{data}'. Error: {exc}")
+            call_in_script_thread(st.error, f"Failed to create: [{kind}] '{data}'. Error: {exc}")
             raise
         except GraphQLError as exc:
-            st.error(f"Failed to create: [{kind}] '{data}'. Error: {exc}")
+            call_in_script_thread(st.error, f"Failed to create: [{kind}] '{data}'. Error: {exc}")
             raise
 
     return node
@@ -317,25 +906,42 @@ async def create_and_add_to_batch(  # pylint: disable=too-many-arguments
     data: dict,
     batch: InfrahubBatch,
     allow_upsert: bool = True,
+    limiter: ConcurrencyLimiter | None = None,
+    address: str | None = None,
 ) -> InfrahubNode:
-    """Creates an object and adds it to a batch for deferred saving."""
-    client: InfrahubClient = await get_client_async()
+    """Creates an object and adds it to a batch for deferred saving, through `limiter` if provided."""
+    client: InfrahubClient = await get_client_async(address=address)
     try:
         obj = await client.create(branch=branch, kind=kind_name, data=data)
-        batch.add(task=obj.save, allow_upsert=allow_upsert, node=obj)
+        if limiter:
+            batch.add(obj.save, task=limiter.run, allow_upsert=allow_upsert, node=obj)
+        else:
+            batch.add(task=obj.save, allow_upsert=allow_upsert, node=obj)
         return obj
     except ValueError as exc:
-        st.error(f"Failed to create: [{kind_name}] '{data}'. Error: {exc}")
+        call_in_script_thread(st.error, f"Failed to create: [{kind_name}] '{data}'. Error: {exc}")
         raise
 
 
-@run_async
-async def execute_batch(batch: InfrahubBatch) -> None:
-    """Executes a batch and provides feedback for each task."""
+@run_async(timeout=BULK_CALL_TIMEOUT)
+async def execute_batch(
+    batch: InfrahubBatch,
+    limiter: ConcurrencyLimiter | None = None,
+    on_progress: Callable[[ConcurrencyStats], None] | None = None,
+) -> None:
+    """Executes a batch and provides feedback for each task.
+
+    With a `limiter`, `on_progress` is called on the script thread with its stats every
+    `IMPORT_PROGRESS_INTERVAL` seconds, and once the batch is done.
+    """
+    reported_at = time.monotonic()
     async for node, result in batch.execute():
+        if limiter and on_progress and time.monotonic() - reported_at >= IMPORT_PROGRESS_INTERVAL:
+            reported_at = time.monotonic()
+            call_in_script_thread(on_progress, limiter.stats())
         try:
             if isinstance(result, Exception):
-                st.error(f"Task execution failed for {node} due to GraphQL error: {result}")
+                call_in_script_thread(st.error, f"Task execution failed for {node} due to GraphQL error: {result}")
             else:
                 object_reference = None
                 if node.hfid:
@@ -344,11 +950,13 @@ async def execute_batch(batch: InfrahubBatch) -> None:
                     # DEPRECATED
                     pass
                 if object_reference:
-                    st.success(f"Created: [{node._schema.kind}] '{object_reference}'")
+                    call_in_script_thread(st.success, f"Created: [{node._schema.kind}] '{object_reference}'")
                 else:
-                    st.success(f"Created: [{node._schema.kind}] '{node.id}'")
+                    call_in_script_thread(st.success, f"Created: [{node._schema.kind}] '{node.id}'")
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            st.error(f"Task execution failed due to unexpected error: {exc}")
+            call_in_script_thread(st.error, f"Task execution failed due to unexpected error: {exc}")
+    if limiter and on_progress:
+        call_in_script_thread(on_progress, limiter.stats())
 
 
 async def get_version_async(client: InfrahubClient) -> str:
@@ -358,11 +966,32 @@ async def get_version_async(client: InfrahubClient) -> str:
     return str(response["InfrahubInfo"]["version"])
 
 
+async def get_server_version_async(client: InfrahubClient) -> str:
+    """Get the Infrahub server version, sharing the request with concurrent callers."""
+    return await _IN_FLIGHT.do(_request_key(client, "version"), partial(get_version_async, client=client))
+
+
 async def check_reachability_async(client: InfrahubClient) -> bool:
+    """Check that Infrahub is reachable, probing it only when its cached health state has expired.
+
+    While the circuit breaker of the address is open, this fails fast without any request.
+    """
+    health = get_health(client.address)
+    now = time.monotonic()
+    if health.is_healthy(now):
+        update_session_state(infrahub_status=InfrahubStatus.OK, infrahub_error_message="")
+        return True
+    if health.is_open(now):
+        update_session_state(
+            infrahub_status=InfrahubStatus.ERROR,
+            infrahub_error_message=f"{health.error_message} (retrying in {health.open_until - now:.0f}s)",
+        )
+        return False
+
     try:
-        await get_version_async(client=client)
-        st.session_state.infrahub_status = InfrahubStatus.OK
-        st.session_state.infrahub_error_message = ""
+        await get_server_version_async(client=client)
+        health.record_success()
+        update_session_state(infrahub_status=InfrahubStatus.OK, infrahub_error_message="")
         return True
     except (
         AuthenticationError,
@@ -372,25 +1001,17 @@ async def check_reachability_async(client: InfrahubClient) -> bool:
         ServerNotReachableError,
         ServerNotResponsiveError,
     ) as exc:
-        st.session_state.infrahub_error_message = str(exc)
-        st.session_state.infrahub_status = InfrahubStatus.ERROR
+        health.record_failure(message=str(exc))
+        if health.failures == CACHE_INVALIDATION_FAILURES:
+            invalidate_instance_caches(address=client.address)
+        update_session_state(infrahub_status=InfrahubStatus.ERROR, infrahub_error_message=str(exc))
         return False
 
 
 @run_async
-async def fetch_schema(branch: str | None = None) -> dict[str, MainSchemaTypes] | None:
-    """Fetch schema from Infrahub."""
-    client: InfrahubClient = await get_client_async()
-    if await check_reachability_async(client=client):
-        result = await client.schema.all(branch=branch)
-        return dict(result) if result else None
-    return None
-
-
-@run_async
-async def run_gql_query(query: str, branch: str | None = None) -> dict[str, Any]:
+async def run_gql_query(query: str, branch: str | None = None, address: str | None = None) -> dict[str, Any]:
     """Run a GraphQL query against Infrahub."""
-    client: InfrahubClient = await get_client_async()
+    client: InfrahubClient = await get_client_async(address=address)
     try:
         result = await client.execute_graphql(query, branch_name=branch)
     except (HTTPStatusError, GraphQLError):
@@ -415,12 +1036,17 @@ async def load_schema(
     the server is unreachable or authentication fails.
     """
     client: InfrahubClient = await get_client_async(address=address)
-    return await client.schema.load(schemas, branch)
+    response = await client.schema.load(schemas, branch)
+    if response.schema_updated:
+        invalidate_schema_cache(address=client.address, branch=branch)
+    return response
 
 
 @run_async
-async def check_schema(branch: str, schemas: list[dict] | None = None) -> SchemaCheckResponse | None:
-    client: InfrahubClient = await get_client_async()
+async def check_schema(
+    branch: str, schemas: list[dict] | None = None, address: str | None = None
+) -> SchemaCheckResponse | None:
+    client: InfrahubClient = await get_client_async(address=address)
     if await check_reachability_async(client=client):
         success, response = await client.schema.check(schemas=schemas, branch=branch)
         schema_check = SchemaCheckResponse(success=success, response=response)
@@ -428,45 +1054,836 @@ async def check_schema(branch: str, schemas: list[dict] | None = None) -> Schema
     return None
 
 
-@run_async
-async def get_branches(address: str | None = None) -> dict[str, BranchData] | None:
-    """Get all branches from Infrahub."""
+# Branch list cache shared by every session, one (fetched at, branches) entry per address
+_BRANCH_CACHE = PartitionedCache()
+
+
+def invalidate_branch_cache(address: str) -> None:
+    """Drop the cached branch list of an Infrahub instance."""
+    _BRANCH_CACHE.invalidate(address=address)
+
+
+# Data fetched from Infrahub for the pages (e.g. exported DataFrames), shared by reference by every session
+OBJECTS_CACHE = PartitionedCache(max_size=OBJECTS_CACHE_MAX_SIZE, ttl=OBJECTS_CACHE_TTL)
+
+
+def invalidate_instance_caches(address: str, branch: str | None = None) -> None:
+    """Drop everything cached for one branch, or for every branch, of an Infrahub instance."""
+    invalidate_schema_cache(address=address, branch=branch)
+    if branch is None:
+        invalidate_branch_cache(address=address)
+    OBJECTS_CACHE.invalidate(address=address, branch=branch)
+
+
+def get_cache_stats() -> dict[str, int]:
+    """Return the entries, size in bytes and hit, miss and eviction counts of the cache of the pages' data."""
+    return OBJECTS_CACHE.stats()
+
+
+def get_cache_usage(address: str) -> int:
+    """Return the size in bytes of the pages' data cached for an Infrahub instance."""
+    return OBJECTS_CACHE.usage().get(address.rstrip("/"), 0)
+
+
+async def get_branches_async(address: str | None = None) -> dict[str, BranchData] | None:
+    """Get all branches from Infrahub, cached for `BRANCH_CACHE_TTL` seconds."""
     client: InfrahubClient = await get_client_async(address=address)
     if await check_reachability_async(client=client):
-        result = await client.branch.all()
-        return dict(result) if result else None
+        cached = _BRANCH_CACHE.get(address=client.address, branch=None, key="branches")
+        if cached and time.monotonic() - cached[0] < BRANCH_CACHE_TTL:
+            return dict(cached[1]) if cached[1] else None
+        result = await _IN_FLIGHT.do(_request_key(client, "branches"), client.branch.all)
+        branches = dict(result) if result else {}
+        _BRANCH_CACHE.set(address=client.address, branch=None, key="branches", value=(time.monotonic(), branches))
+        return dict(branches) if branches else None
     return None
 
 
+def get_branches(address: str | None = None) -> dict[str, BranchData] | None:
+    """Get all branches from Infrahub, cached for `BRANCH_CACHE_TTL` seconds."""
+    return run_sync(get_branches_async(address=address))
+
+
 @run_async
-async def create_branch(branch_name: str) -> BranchData | None:
-    client: InfrahubClient = await get_client_async()
+async def create_branch(branch_name: str, address: str | None = None) -> BranchData | None:
+    client: InfrahubClient = await get_client_async(address=address)
     if await check_reachability_async(client=client):
-        return await client.branch.create(branch_name=branch_name)
+        branch = await client.branch.create(branch_name=branch_name)
+        invalidate_branch_cache(address=client.address)
+        return branch
     return None
 
 
-@run_async
+@run_async(timeout=BULK_CALL_TIMEOUT)
 async def get_objects_as_df(
     kind: str,
     include_id: bool = True,
     branch: str | None = "main",
     populate_store: bool | None = True,
     prefetch_relationships: bool | None = True,
+    use_sdk: bool = False,
+    columns: list[str] | None = None,
+    at: str | None = None,
+    address: str | None = None,
 ) -> pd.DataFrame | None:
-    client: InfrahubClient = await get_client_async()
+    """Get all the objects of a kind as a DataFrame, with related nodes referenced by kind and HFID (or ID).
+
+    By default the objects are fetched with a paginated projection query generated from the schema of the
+    kind. With `use_sdk`, they are fetched as SDK nodes whose related nodes are fetched one by one;
+    `populate_store` and `prefetch_relationships` only apply to that path. With `columns`, only those
+    attributes and relationships are fetched. Column types are derived from the kinds of the attributes.
+
+    With `at`, the objects are fetched as they were at that time. Such exports never change, so they are
+    persisted in `EMMA_EXPORT_CACHE_DIR` and never fetched again.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
     if not await check_reachability_async(client=client):
         return None
+    schema = await _get_kind_schema(client=client, kind=kind, branch=branch)
+    if schema is None:
+        return None
+
+    at = Timestamp(at).to_string() if at else None
+    path = (
+        point_in_time_path(
+            address=client.address,
+            branch=branch,
+            kind=kind,
+            columns=columns if columns is not None else export_columns(schema),
+            include_id=include_id,
+            at=at,
+        )
+        if at
+        else None
+    )
+    rows = await asyncio.to_thread(read_point_in_time_rows, path=path) if path else None
+    if rows is None:
+        if use_sdk:
+            rows = await _IN_FLIGHT.do(
+                _request_key(
+                    client,
+                    "objects",
+                    kind,
+                    branch,
+                    include_id,
+                    populate_store,
+                    prefetch_relationships,
+                    tuple(columns) if columns is not None else None,
+                    at,
+                ),
+                partial(
+                    _fetch_object_rows,
+                    client=client,
+                    kind=kind,
+                    include_id=include_id,
+                    branch=branch,
+                    populate_store=populate_store,
+                    prefetch_relationships=prefetch_relationships,
+                    columns=columns,
+                    at=at,
+                ),
+            )
+        else:
+            rows = await _IN_FLIGHT.do(
+                _request_key(
+                    client,
+                    "projected_objects",
+                    kind,
+                    branch,
+                    include_id,
+                    tuple(columns) if columns is not None else None,
+                    at,
+                ),
+                partial(
+                    _fetch_projected_rows,
+                    client=client,
+                    schema=schema,
+                    include_id=include_id,
+                    branch=branch,
+                    columns=columns,
+                    at=at,
+                ),
+            )
+        if path:
+            await asyncio.to_thread(write_point_in_time_rows, path=path, rows=rows)
+    # Each caller gets its own DataFrame, the coalesced rows are shared
+    return build_dataframe(schema=schema, rows=rows, columns=columns)
+
+
+def is_settled_point_in_time(at: str) -> bool:
+    """Return whether the data at a point in time can no longer change, being `POINT_IN_TIME_MIN_AGE` seconds old."""
+    return bool(Timestamp(at).to_datetime() <= datetime.now(tz=timezone.utc) - timedelta(seconds=POINT_IN_TIME_MIN_AGE))
+
+
+def point_in_time_path(
+    address: str, branch: str | None, kind: str, columns: list[str], include_id: bool, at: str
+) -> Path | None:
+    """Return the file persisting an export at a point in time, or None if it must not be persisted.
+
+    Exports are only persisted when `EMMA_EXPORT_CACHE_DIR` is set and the point in time is at least
+    `POINT_IN_TIME_MIN_AGE` seconds old.
+    """
+    if not EXPORT_CACHE_DIR:
+        return None
+    if not is_settled_point_in_time(at):
+        return None
+    address_key = hashlib.sha256(address.encode()).hexdigest()[:16]
+    export_key = hashlib.sha256(json.dumps([columns, include_id, at]).encode()).hexdigest()[:32]
+    return Path(EXPORT_CACHE_DIR) / address_key / quote(str(branch), safe="") / kind / f"{export_key}.json.gz"
+
+
+def write_point_in_time_rows(path: Path, rows: list[dict[str, Any]]) -> None:
+    """Persist the rows of a point-in-time export, compressed."""
+    # Persisting is a best-effort optimization, failing to do so must never break an export
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(gzip.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8")))
+        tmp_path.replace(path)
+    except (OSError, TypeError):
+        pass
+
+
+def read_point_in_time_rows(path: Path) -> list[dict[str, Any]] | None:
+    """Read the rows of a persisted point-in-time export, if any."""
+    try:
+        return cast("list[dict[str, Any]]", json.loads(gzip.decompress(path.read_bytes())))
+    except (OSError, ValueError):
+        return None
+
 
+async def _fetch_object_rows(
+    client: InfrahubClient,
+    kind: str,
+    include_id: bool,
+    branch: str | None,
+    populate_store: bool | None,
+    prefetch_relationships: bool | None,
+    columns: list[str] | None = None,
+    at: str | None = None,
+) -> list[dict[str, Any]]:
     objs = await client.all(
         kind=kind,
         branch=branch,
+        at=at,
         populate_store=populate_store,
         prefetch_relationships=prefetch_relationships,
         fragment=True,
         parallel=True,
         order=Order(disable=True),
     )
+    resolver = PeerResolver(client=client, concurrency=EXPORT_CONCURRENCY)
+    return list(
+        await asyncio.gather(
+            *(convert_node_to_dict(obj, include_id=include_id, resolver=resolver, columns=columns) for obj in objs)
+        )
+    )
+
+
+async def _fetch_projected_rows(
+    client: InfrahubClient,
+    schema: MainSchemaTypes,
+    include_id: bool,
+    branch: str | None,
+    columns: list[str] | None = None,
+    at: str | None = None,
+) -> list[dict[str, Any]]:
+    return [
+        row
+        async for rows in _iter_projected_rows(
+            client=client, schema=schema, include_id=include_id, branch=branch, columns=columns, at=at
+        )
+        for row in rows
+    ]
+
+
+async def _iter_projected_rows(
+    client: InfrahubClient,
+    schema: MainSchemaTypes,
+    include_id: bool,
+    branch: str | None,
+    columns: list[str] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    at: str | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield the rows of every object of a kind, one page at a time."""
+    async for edges in _iter_pages(
+        client=client,
+        kind=schema.kind,
+        branch=branch,
+        build_query=partial(build_projection_query, schema=schema, include_id=include_id, columns=columns),
+        semaphore=semaphore,
+        at=at,
+    ):
+        yield [node_to_row(schema=schema, node=edge["node"], include_id=include_id, columns=columns) for edge in edges]
+
+
+async def _iter_pages(
+    client: InfrahubClient,
+    kind: str,
+    branch: str | None,
+    build_query: Callable[..., str],
+    semaphore: asyncio.Semaphore | None = None,
+    at: str | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Yield the edges of every page of a paginated query, built by `build_query(offset=..., limit=...)`.
+
+    Pages are fetched `max_concurrent_execution` at a time, so that no more pages are held in memory.
+    A `semaphore` shared by several kinds limits the number of requests in flight across all of them.
+    With `at`, every page is queried at that same point in time.
+    """
+
+    async def fetch_page(offset: int) -> tuple[int, list[dict[str, Any]]]:
+        query = build_query(offset=offset, limit=client.pagination_size)
+        async with semaphore or contextlib.nullcontext():
+            response = await client.execute_graphql(query=query, branch_name=branch, at=at)
+        return response[kind]["count"], response[kind]["edges"]
+
+    # The first page tells how many objects there are, the other pages are then fetched concurrently
+    count, edges = await fetch_page(offset=0)
+    yield edges
+    window = client.pagination_size * client.max_concurrent_execution
+    for start in range(client.pagination_size, count, window):
+        offsets = range(start, min(start + window, count), client.pagination_size)
+        for _, edges in await asyncio.gather(*(fetch_page(offset=offset) for offset in offsets)):
+            yield edges
+
+
+async def _get_kind_schema(client: InfrahubClient, kind: str, branch: str | None) -> MainSchemaTypes | None:
+    infrahub_schema = await get_schema_async(branch=branch, address=client.address)
+    return infrahub_schema.get(kind) if infrahub_schema else None
+
+
+@run_async(timeout=BULK_CALL_TIMEOUT)
+async def export_objects(
+    kind: str,
+    writer: ExportWriter,
+    branch: str | None = "main",
+    include_id: bool = True,
+    address: str | None = None,
+) -> int | None:
+    """Stream every object of a kind to an export writer, holding only a few pages in memory at a time.
+
+    Only the attributes and relationships in the columns of the writer are fetched.
+
+    Returns the number of exported objects, or None if Infrahub is unreachable or the kind unknown.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+    schema = await _get_kind_schema(client=client, kind=kind, branch=branch)
+    if schema is None:
+        return None
+
+    async for rows in _iter_projected_rows(
+        client=client, schema=schema, include_id=include_id, branch=branch, columns=writer.columns
+    ):
+        # Encoding the rows is CPU-bound, notably for Parquet, so it runs off the event loop
+        await asyncio.to_thread(writer.write_rows, rows)
+    await asyncio.to_thread(writer.finish)
+    return writer.rows
+
+
+@run_async(timeout=BULK_CALL_TIMEOUT)
+async def export_archive(
+    kinds: list[str],
+    file_format: str = "csv",
+    branch: str | None = "main",
+    include_id: bool = True,
+    address: str | None = None,
+) -> ExportArchive | None:
+    """Export every attribute and relationship of several kinds into one zip archive.
+
+    The kinds are fetched concurrently, with at most `EXPORT_CONCURRENCY` requests in flight across all of
+    them. Each kind is streamed to its own file, then added to the archive along with its row count and
+    duration in the manifest. A kind which fails to export is recorded as such in the manifest.
+
+    Returns None if Infrahub is unreachable or the schema unavailable.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+    infrahub_schema = await get_schema_async(branch=branch, address=client.address)
+    if not infrahub_schema:
+        return None
+
+    archive = ExportArchive(address=client.address, branch=branch, file_format=file_format)
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+    # Files are added whole, one at a time, so concurrent kinds never interleave in the archive
+    archive_lock = asyncio.Lock()
+
+    async def export_kind(kind: str) -> None:
+        schema = infrahub_schema.get(kind)
+        if schema is None:
+            archive.add_error(kind=kind, error="Unknown kind")
+            return
+        writer = EXPORT_WRITERS[file_format](columns=export_columns(schema), schema=schema)
+        start = time.monotonic()
+        try:
+            async for rows in _iter_projected_rows(
+                client=client,
+                schema=schema,
+                include_id=include_id,
+                branch=branch,
+                columns=writer.columns,
+                semaphore=semaphore,
+            ):
+                await asyncio.to_thread(writer.write_rows, rows)
+            await asyncio.to_thread(writer.finish)
+            async with archive_lock:
+                await asyncio.to_thread(archive.add, kind=kind, writer=writer, seconds=time.monotonic() - start)
+        except (GraphQLError, HTTPError, ServerNotResponsiveError, ServerNotReachableError, KeyError) as exc:
+            archive.add_error(kind=kind, error=str(exc) or type(exc).__name__)
+        finally:
+            writer.close()
+
+    try:
+        await asyncio.gather(*(export_kind(kind) for kind in kinds))
+        await asyncio.to_thread(archive.finish)
+    except BaseException:
+        # The archive is only returned complete, its spooled file is released otherwise
+        archive.close()
+        raise
+    return archive
+
+
+@run_async(timeout=BULK_CALL_TIMEOUT)
+async def refresh_export(
+    kind: str,
+    saved: SavedExport | None = None,
+    branch: str | None = "main",
+    columns: list[str] | None = None,
+    address: str | None = None,
+) -> SavedExport | None:
+    """Bring a saved export of a kind up to date, fetching only the objects updated since it was made.
+
+    The IDs and update times of every object are scanned first, a much lighter query than the export itself.
+    Objects updated after `saved.since` are then fetched by ID and merged into the saved export, and deleted
+    objects are dropped from it. Every object is fetched instead, along with its update time, when there is no
+    saved export, when its columns differ or when the schema of the kind changed since.
+
+    Related nodes are referenced as they were when the object was last updated: renaming a related node alone
+    does not update the objects referencing it.
+
+    Returns None if Infrahub is unreachable or the kind unknown.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+    schema = await _get_kind_schema(client=client, kind=kind, branch=branch)
+    if schema is None:
+        return None
+    columns = columns if columns is not None else export_columns(schema)
+
+    if (
+        saved is None
+        or saved.since is None
+        or not schema.hash
+        or saved.schema_hash != schema.hash
+        or saved.columns != columns
+    ):
+        rows = []
+        since = None
+        async for edges in _iter_pages(
+            client=client,
+            kind=kind,
+            branch=branch,
+            build_query=partial(
+                build_projection_query, schema=schema, include_id=True, columns=columns, include_updated_at=True
+            ),
+        ):
+            for edge in edges:
+                rows.append(node_to_row(schema=schema, node=edge["node"], columns=columns))
+                updated_at = _edge_updated_at(edge)
+                if updated_at and (since is None or updated_at > since):
+                    since = updated_at
+        df = build_dataframe(schema=schema, rows=rows, columns=columns)
+        return SavedExport(df=df, columns=columns, schema_hash=schema.hash, since=since)
+
+    updates: dict[str, datetime | None] = {}
+    async for edges in _iter_pages(
+        client=client, kind=kind, branch=branch, build_query=partial(build_updates_query, schema=schema)
+    ):
+        for edge in edges:
+            updates[edge["node"]["id"]] = _edge_updated_at(edge)
+    since = max((updated_at for updated_at in updates.values() if updated_at), default=None)
+
+    # Objects without an update time are fetched again every time, to never miss a change, and so are the objects
+    # updated at the time of the saved export: others may have been updated at that same time after it was made
+    changed = [
+        object_id for object_id, updated_at in updates.items() if updated_at is None or updated_at >= saved.since
+    ]
+    rows = await _fetch_rows_by_id(client=client, schema=schema, ids=changed, branch=branch, columns=columns)
+    df = merge_delta(
+        schema=schema,
+        previous=saved.df,
+        changed=build_dataframe(schema=schema, rows=rows, columns=columns),
+        ids=list(updates),
+        columns=columns,
+    )
+    return SavedExport(df=df, columns=columns, schema_hash=schema.hash, since=since or saved.since)
+
+
+def _edge_updated_at(edge: dict[str, Any]) -> datetime | None:
+    updated_at = (edge.get("node_metadata") or {}).get("updated_at")
+    return pd.Timestamp(updated_at) if updated_at else None
+
+
+async def _fetch_rows_by_id(
+    client: InfrahubClient, schema: MainSchemaTypes, ids: list[str], branch: str | None, columns: list[str]
+) -> list[dict[str, Any]]:
+    semaphore = asyncio.Semaphore(client.max_concurrent_execution)
+
+    async def fetch_batch(batch: list[str]) -> list[dict[str, Any]]:
+        query = build_projection_query(schema=schema, offset=0, limit=len(batch), columns=columns, ids=batch)
+        async with semaphore:
+            response = await client.execute_graphql(query=query, branch_name=branch)
+        return [
+            node_to_row(schema=schema, node=edge["node"], columns=columns) for edge in response[schema.kind]["edges"]
+        ]
+
+    batches = [ids[start : start + client.pagination_size] for start in range(0, len(ids), client.pagination_size)]
+    return [row for rows in await asyncio.gather(*(fetch_batch(batch) for batch in batches)) for row in rows]
+
+
+@run_async
+async def resolve_hfids(
+    references: dict[str, set[tuple[str, ...]]],
+    branch: str | None = "main",
+    address: str | None = None,
+) -> dict[Reference, str] | None:
+    """Resolve the IDs of related nodes referenced by kind and HFID, with a few requests per kind.
+
+    The whole HFID index of kinds with at most `HFID_INDEX_MAX_OBJECTS` objects is fetched, the objects of
+    larger kinds are looked up `HFID_LOOKUPS_PER_QUERY` at a time with aliased queries. Kinds are resolved
+    concurrently, HFIDs matching no object (or kinds unknown to Infrahub) are missing from the result.
+
+    Returns None if Infrahub is unreachable, and raises the GraphQLError of a query which failed.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+    return await _resolve_references(
+        client=client,
+        references=references,
+        branch=branch,
+        semaphore=asyncio.Semaphore(client.max_concurrent_execution),
+    )
+
+
+async def _resolve_references(
+    client: InfrahubClient,
+    references: dict[str, set[tuple[str, ...]]],
+    branch: str | None,
+    semaphore: asyncio.Semaphore,
+) -> dict[Reference, str]:
+    resolved = await asyncio.gather(
+        *(
+            _resolve_kind_hfids(client=client, kind=kind, hfids=hfids, branch=branch, semaphore=semaphore)
+            for kind, hfids in references.items()
+        )
+    )
+    return {
+        (kind, hfid): object_id
+        for kind, ids in zip(references, resolved, strict=True)
+        for hfid, object_id in ids.items()
+    }
+
+
+async def _resolve_kind_hfids(
+    client: InfrahubClient, kind: str, hfids: set[tuple[str, ...]], branch: str | None, semaphore: asyncio.Semaphore
+) -> dict[tuple[str, ...], str]:
+    async def execute(query: str) -> dict[str, Any]:
+        async with semaphore:
+            return cast("dict[str, Any]", await client.execute_graphql(query=query, branch_name=branch))
+
+    if len(hfids) > HFID_LOOKUPS_PER_QUERY:
+        # The first page of the index tells whether the kind is small enough to be indexed whole
+        first_page = await execute(build_hfid_index_query(kind=kind, offset=0, limit=client.pagination_size))
+        count = first_page[kind]["count"]
+        if count <= HFID_INDEX_MAX_OBJECTS:
+            pages = [first_page] + await asyncio.gather(
+                *(
+                    execute(build_hfid_index_query(kind=kind, offset=offset, limit=client.pagination_size))
+                    for offset in range(client.pagination_size, count, client.pagination_size)
+                )
+            )
+            index = {
+                tuple(edge["node"]["hfid"]): edge["node"]["id"]
+                for page in pages
+                for edge in page[kind]["edges"]
+                if edge["node"]["hfid"]
+            }
+            return {hfid: index[hfid] for hfid in hfids if hfid in index}
+
+    hfid_list = list(hfids)
+    batches = [
+        hfid_list[start : start + HFID_LOOKUPS_PER_QUERY] for start in range(0, len(hfid_list), HFID_LOOKUPS_PER_QUERY)
+    ]
+    responses = await asyncio.gather(*(execute(build_hfid_lookup_query(kind=kind, hfids=batch)) for batch in batches))
+    return {
+        hfid: response[f"hfid{index}"]["edges"][0]["node"]["id"]
+        for batch, response in zip(batches, responses, strict=True)
+        for index, hfid in enumerate(batch)
+        if len(response[f"hfid{index}"]["edges"]) == 1
+    }
+
+
+# Errors stopping a stage of a streamed import, invalid CSV content and encodings being ValueErrors raised by pandas
+IMPORT_STAGE_ERRORS = (ValueError, KeyError, GraphQLError, HTTPError, ServerNotResponsiveError, ServerNotReachableError)
+
+
+@run_async(timeout=BULK_CALL_TIMEOUT)
+async def import_csv(
+    source: Any,
+    kind: str,
+    branch: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    objects_per_request: int = IMPORT_OBJECTS_PER_REQUEST,
+    on_progress: Callable[[ImportProgress], None] | None = None,
+    address: str | None = None,
+) -> ImportProgress | None:
+    """Import the objects of a CSV file chunk by chunk, the stages of the import running concurrently.
+
+    Chunks of `chunk_size` rows are read and cleaned, then preprocessed with the HFIDs they reference
+    resolved (each HFID only once for the whole file), then saved with a batch, or with mutations upserting
+    `objects_per_request` objects each when it is greater than 1. The stages are connected
+    by queues of `IMPORT_QUEUE_SIZE` chunks, so the memory used doesn't depend on the size of the file and
+    the first objects are saved while the rest of the file is still being read. `on_progress` is called
+    on the script thread with the progress of the import after each saved chunk. A stage failing, on an
+    invalid file or a server error, stops the import with the error reported in `progress.error`.
+
+    Returns None if Infrahub is unreachable or the kind unknown.
+    """
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return None
+    schema = await _get_kind_schema(client=client, kind=kind, branch=branch)
+    if schema is None:
+        return None
+
+    progress = ImportProgress()
+    semaphore = asyncio.Semaphore(client.max_concurrent_execution)
+    read_chunks: asyncio.Queue[pd.DataFrame | None] = asyncio.Queue(maxsize=IMPORT_QUEUE_SIZE)
+    preprocessed_chunks: asyncio.Queue[pd.DataFrame | None] = asyncio.Queue(maxsize=IMPORT_QUEUE_SIZE)
+
+    async def read() -> None:
+        with pd.read_csv(source, chunksize=chunk_size) as reader:
+            while (chunk := await asyncio.to_thread(next, reader, None)) is not None:
+                progress.rows_read += len(chunk)
+                await read_chunks.put(clean_chunk(chunk))
+        await read_chunks.put(None)
+
+    async def preprocess() -> None:
+        resolved: dict[Reference, str] = {}
+        looked_up: set[Reference] = set()
+        while (chunk := await read_chunks.get()) is not None:
+            references = {
+                peer_kind: {hfid for hfid in hfids if (peer_kind, hfid) not in looked_up}
+                for peer_kind, hfids in collect_references(df=chunk, schema=schema).items()
+            }
+            references = {peer_kind: hfids for peer_kind, hfids in references.items() if hfids}
+            resolved.update(
+                await _resolve_references(client=client, references=references, branch=branch, semaphore=semaphore)
+            )
+            for peer_kind, hfids in references.items():
+                for hfid in sorted(hfids):
+                    looked_up.add((peer_kind, hfid))
+                    if (peer_kind, hfid) not in resolved:
+                        progress.add_error(f"Unable to find {peer_kind} {'__'.join(hfid)!r}")
+            await preprocessed_chunks.put(preprocess_dataframe(df=chunk, schema=schema, resolved=resolved))
+        await preprocessed_chunks.put(None)
+
+    async def save() -> None:
+        while (chunk := await preprocessed_chunks.get()) is not None:
+            await _save_chunk(
+                client=client,
+                kind=kind,
+                branch=branch,
+                chunk=chunk,
+                progress=progress,
+                objects_per_request=objects_per_request,
+                semaphore=semaphore,
+            )
+            if on_progress:
+                call_in_script_thread(on_progress, progress.model_copy(deep=True))
+
+    tasks = [
+        asyncio.ensure_future(_run_import_stage(name=name, stage=stage, progress=progress))
+        for name, stage in (("Reading the file", read()), ("Resolving references", preprocess()), ("Saving", save()))
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except IMPORT_STAGE_ERRORS:
+        # Reported in the progress by the failing stage
+        pass
+    finally:
+        # A failing stage stops the others, instead of leaving them blocked on a queue
+        for task in tasks:
+            task.cancel()
+    progress.done = True
+    return progress
+
+
+async def _run_import_stage(name: str, stage: Coroutine[Any, Any, None], progress: ImportProgress) -> None:
+    try:
+        await stage
+    except IMPORT_STAGE_ERRORS as exc:
+        progress.error = f"{name} failed: {exc}"
+        raise
+
+
+async def _save_chunk(  # pylint: disable=too-many-arguments
+    client: InfrahubClient,
+    kind: str,
+    branch: str,
+    chunk: pd.DataFrame,
+    progress: ImportProgress,
+    objects_per_request: int = 1,
+    semaphore: asyncio.Semaphore | None = None,
+) -> None:
+    nodes: list[tuple[Any, InfrahubNode]] = []
+    for index, row in zip(chunk.index, chunk.to_dict(orient="records"), strict=True):
+        try:
+            nodes.append((index, await client.create(kind=kind, branch=branch, data=row_to_data(row))))
+        except ValueError as exc:
+            progress.add_failure(index=index, error=exc)
+
+    if objects_per_request > 1:
+        semaphore = semaphore or asyncio.Semaphore(client.max_concurrent_execution)
+        await asyncio.gather(
+            *(
+                _upsert_nodes(
+                    client=client,
+                    kind=kind,
+                    branch=branch,
+                    nodes=nodes[start : start + objects_per_request],
+                    progress=progress,
+                    semaphore=semaphore,
+                )
+                for start in range(0, len(nodes), objects_per_request)
+            )
+        )
+        return
+
+    batch = await client.create_batch(return_exceptions=True)
+    rows: dict[int, Any] = {}
+    for index, node in nodes:
+        rows[id(node)] = index
+        batch.add(task=node.save, allow_upsert=True, node=node)
+
+    async for node, result in batch.execute():
+        if isinstance(result, Exception):
+            progress.add_failure(index=rows[id(node)], error=result)
+        else:
+            progress.rows_saved += 1
+
+
+async def _upsert_nodes(  # pylint: disable=too-many-arguments
+    client: InfrahubClient,
+    kind: str,
+    branch: str,
+    nodes: list[tuple[Any, InfrahubNode]],
+    progress: ImportProgress,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """Upsert nodes of a kind with a single aliased mutation, mapping its errors back to their rows.
+
+    Objects of an aliased mutation are saved independently, so that only the objects with an error failed.
+    If the mutation is rejected as a whole, its objects are saved one at a time to find the failing ones.
+    If it fails in transit, on a timeout or an HTTP error, every one of its objects failed.
+    """
+    query, variables = build_upsert_mutation(
+        kind=kind, inputs=[node._generate_input_data(exclude_hfid=True) for _, node in nodes]
+    )
+    try:
+        async with semaphore:
+            await client.execute_graphql(
+                query=query, branch_name=branch, variables=variables, tracker=f"mutation-{kind.lower()}-upsert-many"
+            )
+    except GraphQLError as exc:
+        failures = map_upsert_errors(exc.errors)
+        if failures is None:
+            for index, node in nodes:
+                try:
+                    async with semaphore:
+                        await node.save(allow_upsert=True)
+                except (
+                    GraphQLError,
+                    ValueError,
+                    HTTPError,
+                    ServerNotResponsiveError,
+                    ServerNotReachableError,
+                    TimeoutError,
+                ) as node_exc:
+                    progress.add_failure(index=index, error=node_exc)
+                else:
+                    progress.rows_saved += 1
+            return
+        for position, (index, _) in enumerate(nodes):
+            if position in failures:
+                progress.add_failure(index=index, error=failures[position])
+            else:
+                progress.rows_saved += 1
+        return
+    except (HTTPError, ServerNotResponsiveError, ServerNotReachableError, TimeoutError) as exc:
+        # As with a batch, a request failing in transit fails each of its objects, not the whole import
+        for index, _ in nodes:
+            progress.add_failure(index=index, error=exc)
+        return
+    progress.rows_saved += len(nodes)
+
+
+class PageData(BaseModel):
+    """Data commonly needed to render a page, fetched concurrently by `load_page_data`."""
+
+    reachable: bool = False
+    # Values are the SDK's API schema classes, which don't validate against `MainSchemaTypes`
+    infrahub_schema: dict[str, Any] | None = None
+    branches: dict[str, BranchData] | None = None
+    version: str | None = None
 
-    df = pd.DataFrame([await convert_node_to_dict(obj, include_id=include_id) for obj in objs])
-    return df
+
+async def _skip() -> None:
+    return None
+
+
+async def load_page_data_async(
+    branch: str | None = None,
+    address: str | None = None,
+    include_schema: bool = True,
+    include_branches: bool = True,
+    include_version: bool = False,
+) -> PageData:
+    """Fetch the schema, branch list and server version concurrently, after a single reachability check."""
+    client: InfrahubClient = await get_client_async(address=address)
+    if not await check_reachability_async(client=client):
+        return PageData()
+
+    infrahub_schema, branches, version = await asyncio.gather(
+        get_schema_async(branch=branch, address=address) if include_schema else _skip(),
+        get_branches_async(address=address) if include_branches else _skip(),
+        get_server_version_async(client=client) if include_version else _skip(),
+    )
+    return PageData(reachable=True, infrahub_schema=infrahub_schema, branches=branches, version=version)
+
+
+def load_page_data(
+    branch: str | None = None,
+    include_schema: bool = True,
+    include_branches: bool = True,
+    include_version: bool = False,
+) -> PageData:
+    """Fetch what a page needs from the current Infrahub instance in one round of concurrent requests."""
+    address = get_instance_address()
+    if not address:
+        return PageData()
+    return run_sync(
+        load_page_data_async(
+            branch=branch,
+            address=address,
+            include_schema=include_schema,
+            include_branches=include_branches,
+            include_version=include_version,
+        )
+    )
@@ -1,17 +1,18 @@
-import asyncio
-
 import streamlit as st
 from streamlit.delta_generator import DeltaGenerator
 from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 from emma.infrahub import (
+    PageData,
     check_reachability_async,
+    close_idle_clients,
     create_branch,
     get_branches,
     get_client_async,
     get_instance_address,
     get_instance_branch,
     is_current_schema_empty,
+    run_sync,
 )
 
 
@@ -55,9 +56,12 @@ def set_branch() -> None:
     st.session_state.infrahub_branch = st.session_state._infrahub_branch
 
 
-def display_branch_selector(sidebar: DeltaGenerator) -> None:
+def display_branch_selector(sidebar: DeltaGenerator, page_data: PageData | None = None) -> None:
     # st.session_state._infrahub_branch = None
-    branches = get_branches(address=st.session_state.infrahub_address)
+    if page_data and page_data.reachable:
+        branches = page_data.branches
+    else:
+        branches = get_branches(address=st.session_state.infrahub_address)
     current_branch = get_instance_branch()
     if current_branch:
         st.session_state._infrahub_branch = st.session_state.infrahub_branch
@@ -84,13 +88,25 @@ def display_infrahub_address(sidebar: DeltaGenerator) -> None:
     )
 
 
+def set_infrahub_address(new_address: str) -> None:
+    """Switch the session to a new Infrahub address.
+
+    The pooled clients of the previous address may still be used by other sessions, so only those which
+    have been idle for a while are closed.
+    """
+    previous_address = st.session_state.get("infrahub_address")
+    if previous_address and previous_address != new_address:
+        close_idle_clients()
+    st.session_state.infrahub_address = new_address
+
+
 def input_infrahub_address() -> None:
     """Display a form to input the Infrahub address."""
     with st.form(key="input_address_form"):
         new_address = st.text_input(label="Enter Infrahub Address", value=st.session_state.infrahub_address)
         submit_address = st.form_submit_button(label="Submit")
         if submit_address and new_address:
-            st.session_state.infrahub_address = new_address
+            set_infrahub_address(new_address)
             st.toast(f"Trying to connect to {new_address}")
             st.rerun()
 
@@ -122,8 +138,8 @@ def ensure_infrahub_address_and_branch() -> None:
     if "infrahub_address" in st.session_state and st.session_state.infrahub_address:
         address = st.session_state.infrahub_address
         try:
-            client = asyncio.run(get_client_async(address=address))
-            is_reachable = asyncio.run(check_reachability_async(client=client))
+            client = run_sync(get_client_async(address=address))
+            is_reachable = run_sync(check_reachability_async(client=client))
 
             if not is_reachable:
                 handle_reachability_error()
@@ -142,7 +158,6 @@ def ensure_infrahub_address_and_branch() -> None:
 def handle_reachability_error(redirect: bool | None = True) -> None:
     """Handle Infrahub reachability errors."""
     st.toast(icon="🚨", body=f"Error: {st.session_state.infrahub_error_message}")
-    st.cache_data.clear()  # TODO: Maybe something less violent ?
     if not redirect:
         st.stop()
     current_page = get_current_page()
@@ -155,7 +170,7 @@ def update_infrahub_instance_dialog() -> None:
     """Display a dialog to update the Infrahub instance address."""
     new_instance = st.text_input(label="Infrahub Address:", placeholder="http://infrahub-server-fqdn")
     if new_instance or st.button("Submit"):
-        st.session_state.infrahub_address = new_instance
+        set_infrahub_address(new_instance)
         st.rerun()
 
 
@@ -164,7 +179,7 @@ def create_branch_dialog() -> None:
     """Display a dialog to create a new branch."""
     new_branch_name = st.text_input(label="New Branch", placeholder="new-branch-name")
     if new_branch_name or st.button("Submit"):
-        create_branch(branch_name=new_branch_name)
+        create_branch(branch_name=new_branch_name, address=st.session_state.infrahub_address)
         st.session_state.infrahub_branch = new_branch_name
         st.rerun()
 
@@ -1,5 +1,6 @@
 import streamlit as st
 
+from emma.infrahub import PageData
 from emma.streamlit_utils import (
     add_create_branch_button,
     display_branch_selector,
@@ -10,7 +11,7 @@ from emma.streamlit_utils import (
 from emma.utils import is_feature_enabled
 
 
-def menu():
+def menu(page_data: PageData | None = None):
     if "infrahub_address" not in st.session_state or st.session_state.infrahub_address is None:
         st.sidebar.page_link("main.py", label="🏠 Homepage")
         return
@@ -24,7 +25,7 @@ def menu():
         update_infrahub_instance_button(st.sidebar)
 
         # Display Branch Selector
-        display_branch_selector(st.sidebar)  # Always display the branch selector
+        display_branch_selector(st.sidebar, page_data=page_data)  # Always display the branch selector
         add_create_branch_button(st.sidebar)
         st.divider()
 
@@ -45,9 +46,9 @@ def menu():
                 st.page_link("pages/template_builder.py", label="📝 Template Builder")
 
 
-def menu_with_redirect():
+def menu_with_redirect(page_data: PageData | None = None):
     # Redirect users to the main page
     if "infrahub_address" not in st.session_state or st.session_state.infrahub_address is None:
         st.switch_page("main.py")
 
-    menu()
+    menu(page_data=page_data)
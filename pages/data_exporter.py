@@ -1,13 +1,30 @@
 import types
-from ipaddress import IPv4Network, IPv6Network
+from functools import partial
 from typing import Any, Dict, List
 
 import pandas as pd
 import streamlit as st
+from infrahub_sdk.exceptions import TimestampFormatError
+from infrahub_sdk.schema import NodeSchemaAPI
+from infrahub_sdk.timestamp import Timestamp
 from pydantic import BaseModel
 from streamlit_sortables import sort_items
 
-from emma.infrahub import get_cached_schema, get_objects_as_df
+from emma.export_utils import EXPORT_WRITERS, ExportWriter, dataframe_to_parquet
+from emma.infrahub import (
+    OBJECTS_CACHE,
+    OBJECTS_CACHE_MAX_SIZE,
+    export_archive,
+    export_objects,
+    get_cache_stats,
+    get_cache_usage,
+    get_instance_address,
+    get_instance_branch,
+    get_objects_as_df,
+    is_settled_point_in_time,
+    load_page_data,
+    refresh_export,
+)
 from emma.streamlit_utils import handle_reachability_error, set_page_config
 from menu import menu_with_redirect
 
@@ -22,24 +39,61 @@ class ColumnMapping(BaseModel):
     label_to_col: Dict[str, str]
 
 
-@st.cache_data
 def convert_df_to_csv(df: pd.DataFrame) -> bytes:
     """Convert DataFrame to CSV in bytes format."""
     csv_str = df.to_csv(index=False)
     return csv_str.encode("utf-8") if csv_str else b""
 
 
-@st.cache_data
-def fetch_data(kind: str, branch: str) -> pd.DataFrame:
-    """Fetches data once per session for the selected model."""
-    df = get_objects_as_df(kind=kind, include_id=False, branch=branch, prefetch_relationships=False)
-    # Only convert IPv4Network and IPv6Network objects to strings
-    for col in df.columns:
-        if df[col].dtype == "object":  # Only check object columns
-            if df[col].apply(lambda x: isinstance(x, (IPv4Network, IPv6Network))).any():
-                df[col] = df[col].apply(lambda x: str(x) if isinstance(x, (IPv4Network, IPv6Network)) else x)
+def fetch_data(
+    kind: str, branch: str, columns: List[str], refresh: bool = False, at: str | None = None
+) -> pd.DataFrame | None:
+    """Fetches the selected columns once per Infrahub instance and branch for the selected model.
 
-    return df
+    With `refresh`, only the objects changed since are fetched and merged into the cached export.
+    With `at`, the objects are fetched as they were at that time, and only cached once that data can no
+    longer change.
+    """
+    address = get_instance_address()
+    if address is None:
+        return None
+    if at:
+        at_cache_key = ("export_at", kind, tuple(sorted(columns)), at)
+        df = OBJECTS_CACHE.get(address=address, branch=branch, key=at_cache_key)
+        if df is None:
+            df = get_objects_as_df(
+                kind=kind, include_id=False, branch=branch, columns=sorted(columns), at=at, address=address
+            )
+            if df is None:
+                return None
+            if is_settled_point_in_time(at):
+                OBJECTS_CACHE.set(address=address, branch=branch, key=at_cache_key, value=df)
+        return df
+
+    cache_key = ("export", kind, tuple(sorted(columns)))
+    saved = OBJECTS_CACHE.get(address=address, branch=branch, key=cache_key)
+    if saved is not None and not refresh:
+        return saved.df
+
+    saved = refresh_export(kind=kind, saved=saved, branch=branch, columns=sorted(columns), address=address)
+    if saved is None:
+        return None
+    OBJECTS_CACHE.set(address=address, branch=branch, key=cache_key, value=saved)
+    return saved.df
+
+
+def display_cache_stats() -> None:
+    """Display how much data is cached for the pages, shared by every session, and how often it is reused."""
+    stats = get_cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "-"
+    address = get_instance_address()
+    instance_size = get_cache_usage(address=address) if address else 0
+    st.caption(
+        f"Cached data: {stats['entries']} entries, {stats['size'] / 2**20:.1f} of "
+        f"{OBJECTS_CACHE_MAX_SIZE / 2**20:.0f} MiB ({instance_size / 2**20:.1f} MiB for this instance), "
+        f"{hit_rate} hit rate, {stats['evictions']} evictions"
+    )
 
 
 def get_column_labels(model_schema: Any) -> ColumnLabels:
@@ -63,48 +117,130 @@ def create_column_label_mapping(
     return ColumnMapping(labels=column_labels, label_to_col=label_to_col)
 
 
-def filter_and_reorder_columns(df: pd.DataFrame, to_omit: List[str], column_mapping: ColumnMapping) -> pd.DataFrame:
-    """Filter and reorder columns based on user selections."""
-    remaining_columns = [col for col in df.columns if col not in to_omit]
+def order_columns(columns: List[str], to_omit: List[str], column_mapping: ColumnMapping) -> List[str]:
+    """Filter and reorder column names based on user selections."""
+    remaining_columns = [col for col in columns if col not in to_omit]
     ordered_labels = sort_items(column_mapping.labels)
-    ordered_columns = [
+    return [
         column_mapping.label_to_col[label]
         for label in ordered_labels
         if column_mapping.label_to_col[label] in remaining_columns
     ]
-    return df[ordered_columns]
+
+
+def stream_export(
+    kind: str, branch: str, columns: List[str], model_schema: Any, file_format: str
+) -> ExportWriter | None:
+    """Stream every object of a kind to a temporary file, keeping only a preview in memory."""
+    writer = EXPORT_WRITERS[file_format](columns=columns, schema=model_schema)
+    if (
+        export_objects(kind=kind, writer=writer, branch=branch, include_id=False, address=get_instance_address())
+        is None
+    ):
+        writer.close()
+        return None
+    return writer
+
+
+def display_streamed_export(kind: str, branch: str, columns: List[str], model_schema: Any, file_format: str) -> None:
+    """Export the selected kind on demand and display a preview and a download button for the file."""
+    export_key = (get_instance_address(), branch, kind, tuple(columns), file_format)
+    streamed_export = st.session_state.get("streamed_export")
+    if streamed_export and streamed_export[0] != export_key:
+        streamed_export[1].close()
+        streamed_export = st.session_state["streamed_export"] = None
+
+    if st.button("Export", disabled=not columns):
+        with st.spinner("Exporting data, please wait..."):
+            writer = stream_export(
+                kind=kind, branch=branch, columns=columns, model_schema=model_schema, file_format=file_format
+            )
+        if writer is None:
+            st.session_state.infrahub_error_message = "Export failed"
+            handle_reachability_error(redirect=False)
+        streamed_export = st.session_state["streamed_export"] = (export_key, writer)
+
+    if streamed_export:
+        writer = streamed_export[1]
+        st.caption(f"{writer.rows} objects exported, preview of the first {len(writer.preview)}:")
+        st.dataframe(writer.preview_df(), hide_index=True)
+        st.download_button(
+            f"Download {writer.extension.upper()} File",
+            writer.read,
+            f"{kind}.{writer.extension}",
+            writer.mime,
+            key="download-streamed-export",
+        )
+
+
+def select_bulk_kinds(infrahub_schema: Dict[str, Any], namespaces: List[str], kinds: List[str]) -> List[str]:
+    """Return the selected kinds along with every node kind of the selected namespaces."""
+    # Generics are left out of namespaces, their objects are already exported with the kinds inheriting from them
+    namespace_kinds = [
+        kind
+        for kind, model_schema in infrahub_schema.items()
+        if isinstance(model_schema, NodeSchemaAPI) and model_schema.namespace in namespaces
+    ]
+    return sorted({*kinds, *namespace_kinds})
+
+
+def display_bulk_export(infrahub_schema: Dict[str, Any], branch: str) -> None:
+    """Export several models, or whole namespaces, on demand into one zip archive with a manifest."""
+    namespaces = st.multiselect(
+        "Namespaces to export:", options=sorted({model_schema.namespace for model_schema in infrahub_schema.values()})
+    )
+    kinds = st.multiselect("Models to export:", options=list(infrahub_schema))
+    kinds = select_bulk_kinds(infrahub_schema=infrahub_schema, namespaces=namespaces, kinds=kinds)
+    file_format = st.radio("Archive file format:", options=list(EXPORT_WRITERS), format_func=str.upper, horizontal=True)
+
+    export_key = (get_instance_address(), branch, tuple(kinds), file_format)
+    bulk_export = st.session_state.get("bulk_export")
+    if bulk_export and bulk_export[0] != export_key:
+        bulk_export[1].close()
+        bulk_export = st.session_state["bulk_export"] = None
+
+    if st.button(f"Export {len(kinds)} models", disabled=not kinds):
+        with st.spinner("Exporting data, please wait..."):
+            archive = export_archive(
+                kinds=kinds, file_format=file_format, branch=branch, include_id=False, address=get_instance_address()
+            )
+        if archive is None:
+            st.session_state.infrahub_error_message = "Export failed"
+            handle_reachability_error(redirect=False)
+        bulk_export = st.session_state["bulk_export"] = (export_key, archive)
+
+    if bulk_export:
+        archive = bulk_export[1]
+        st.dataframe(pd.DataFrame(archive.manifest["kinds"]), hide_index=True)
+        st.download_button("Download archive", archive.read, "infrahub-export.zip", archive.mime, key="download-bulk")
 
 
 set_page_config(title="Data Exporter")
 st.markdown("# Data Exporter")
-menu_with_redirect()
+page_data = load_page_data(branch=get_instance_branch())
+menu_with_redirect(page_data=page_data)
 
-infrahub_schema = get_cached_schema(branch=st.session_state.infrahub_branch)
+infrahub_schema = page_data.infrahub_schema
 if not infrahub_schema:
     st.session_state.infrahub_error_message = "No schema"
     handle_reachability_error()
 else:
-    selected_option = st.selectbox("Select which model you want to explore?", infrahub_schema.keys())
+    with st.expander("Bulk export"):
+        display_bulk_export(infrahub_schema=infrahub_schema, branch=st.session_state.infrahub_branch)
 
-    # Check if `selected_option` has changed to reset `dataframe` and `reordered_df`
-    if "last_selected_option" not in st.session_state or st.session_state.last_selected_option != selected_option:
-        with st.spinner("Loading data, please wait..."):
-            st.session_state["dataframe"] = fetch_data(selected_option, st.session_state.infrahub_branch)
-            if isinstance(st.session_state["dataframe"], types.NoneType):
-                st.session_state.infrahub_error_message = "No dataframe"
-                handle_reachability_error(redirect=False)
-            else:
-                st.session_state["reordered_df"] = st.session_state["dataframe"]  # Reset reordered_df
-                st.session_state["last_selected_option"] = selected_option
-                st.session_state["omitted_columns"] = []
-
-        # Fetch schema and column labels only when `selected_option` changes
-        selected_schema = infrahub_schema[selected_option]
-        column_labels_info = get_column_labels(model_schema=selected_schema)
-        st.session_state["column_labels_info"] = column_labels_info  # Save for later access
-
-    # UI elements outside the selection check, so they persist during re-runs
-    column_labels_info = st.session_state["column_labels_info"]
+    selected_option = st.selectbox("Select which model you want to explore?", infrahub_schema.keys())
+    streaming = st.toggle(
+        "Streaming export",
+        help="For very large models: objects are written page by page to a file and only a preview is displayed.",
+    )
+    file_format = st.radio(
+        "File format:",
+        options=list(EXPORT_WRITERS),
+        format_func=str.upper,
+        horizontal=True,
+        help="Parquet keeps the column types and is compressed, for analytics tools.",
+    )
+    column_labels_info = get_column_labels(model_schema=infrahub_schema[selected_option])
 
     st.info(
         icon="💡",
@@ -112,6 +248,7 @@ else:
             You can personalize the CSV by removing Optional fields or re-ordering them.
             Drag and drop the column names to reorder them.
             The columns marked as '(Mandatory)' cannot be omitted.
+            Omitted columns are not fetched from Infrahub.
             """,
     )
     # Omit all optional columns by default
@@ -129,21 +266,75 @@ else:
     if omitted_columns != st.session_state["omitted_columns"]:
         st.session_state["omitted_columns"] = omitted_columns
 
-    # Create the column mapping and filter/reorder DataFrame
+    # Create the column mapping and the ordered list of columns to export
     column_label_mapping_info = create_column_label_mapping(
         to_omit=omitted_columns,
         optional_columns=column_labels_info.optional,
         mandatory_columns=column_labels_info.mandatory,
     )
-
-    # Re-filter only when omitted_columns changes
-    st.session_state["reordered_df"] = filter_and_reorder_columns(
-        df=st.session_state["dataframe"],
+    columns = order_columns(
+        columns=column_labels_info.mandatory + column_labels_info.optional,
         to_omit=omitted_columns,
         column_mapping=column_label_mapping_info,
     )
 
-    # Display and provide download button for the CSV
-    csv = convert_df_to_csv(df=st.session_state["reordered_df"])
-    st.dataframe(st.session_state["reordered_df"], hide_index=True)
-    st.download_button("Download CSV File", csv, f"{selected_option}.csv", "text/csv", key="download-csv")
+    if streaming:
+        display_streamed_export(
+            kind=selected_option,
+            branch=st.session_state.infrahub_branch,
+            columns=columns,
+            model_schema=infrahub_schema[selected_option],
+            file_format=file_format,
+        )
+    else:
+        at: str | None = (
+            st.text_input(
+                "Point in time:",
+                placeholder="2025-01-31T12:00:00Z",
+                help="Export the objects as they were at that time, leave empty for the current data.",
+            ).strip()
+            or None
+        )
+        if at:
+            try:
+                at = Timestamp(at).to_string()
+            except TimestampFormatError:
+                st.error(f"Invalid point in time: {at}")
+                st.stop()
+        refresh = st.button(
+            "Refresh", disabled=bool(at), help="Fetch only the objects changed since the data was loaded."
+        )
+        # Only the selected columns are fetched, then cached per model and set of columns
+        with st.spinner("Loading data, please wait..."):
+            dataframe = fetch_data(selected_option, st.session_state.infrahub_branch, columns, refresh=refresh, at=at)
+        if isinstance(dataframe, types.NoneType):
+            st.session_state.infrahub_error_message = "No dataframe"
+            handle_reachability_error(redirect=False)
+            st.stop()
+        reordered_df = dataframe.reindex(columns=columns)
+
+        # Display and provide download button for the file
+        st.dataframe(reordered_df, hide_index=True)
+        display_cache_stats()
+        if file_format == "parquet":
+            st.download_button(
+                "Download PARQUET File",
+                partial(
+                    dataframe_to_parquet,
+                    df=reordered_df,
+                    schema=infrahub_schema[selected_option],
+                    columns=columns,
+                ),
+                f"{selected_option}.parquet",
+                EXPORT_WRITERS["parquet"].mime,
+                key="download-parquet",
+            )
+        else:
+            # Converted only when downloaded, instead of keeping a copy of the file for every session
+            st.download_button(
+                "Download CSV File",
+                partial(convert_df_to_csv, df=reordered_df),
+                f"{selected_option}.csv",
+                "text/csv",
+                key="download-csv",
+            )
@@ -1,28 +1,44 @@
-import asyncio
-from ast import literal_eval
+import logging
 from enum import Enum
-from typing import Any, List, Union
+from functools import partial
+from typing import Any
 
 import numpy as np
 import pandas as pd
 import streamlit as st
-from infrahub_sdk.schema import GenericSchema, GenericSchemaAPI, MainSchemaTypes, NodeSchema
+from infrahub_sdk.batch import InfrahubBatch
+from infrahub_sdk.exceptions import GraphQLError
+from infrahub_sdk.schema import NodeSchema
 from infrahub_sdk.utils import compare_lists
 from pandas.errors import EmptyDataError
 from pydantic import BaseModel
 from streamlit.delta_generator import DeltaGenerator
 
+from emma.concurrency_utils import ConcurrencyLimiter, ConcurrencyStats
+from emma.import_utils import (
+    IMPORT_MAX_IN_FLIGHT,
+    IMPORT_OBJECTS_PER_REQUEST,
+    IMPORT_PREVIEW_ROWS,
+    ImportProgress,
+    Reference,
+    clean_chunk,
+    collect_references,
+    preprocess_dataframe,
+)
 from emma.infrahub import (
     create_and_add_to_batch,
     execute_batch,
-    get_cached_schema,
-    get_client_async,
+    get_instance_address,
     get_instance_branch,
+    import_csv,
+    load_page_data,
+    resolve_hfids,
 )
 from emma.streamlit_utils import handle_reachability_error, set_page_config
-from emma.utils import is_uuid, parse_hfid
 from menu import menu_with_redirect
 
+logger = logging.getLogger(__name__)
+
 
 class MessageSeverity(str, Enum):
     INFO = "info"
@@ -35,40 +51,24 @@ class Message(BaseModel):
     message: str
 
 
-def parse_item(item: str, is_generic: bool) -> str:
-    """Parse a single item as a UUID, HFID, or leave as-is."""
-    if is_uuid(item):
-        return item
-    # FIXME: Need feature in thee SDK to avoid this
-    # If the relationship is toward Generic we will retrieve the ID as we can't use HFID with a relationship to Generic
-    if is_generic:
-        tmp_hfid = parse_hfid(hfid=item)
-        client = asyncio.run(get_client_async())
-        obj = asyncio.run(client.get(kind=tmp_hfid[0], hfid=tmp_hfid[1:], branch=get_instance_branch()))
-        return str(obj.id)
-    # FIXME: If there isn't any default_filter, and we keep the HFID here
-    # In process_and_save_with_batch() the data will be { id: "['xxx']" } instead of { hfid: "['xxx']" }
-    tmp_hfid = parse_hfid(hfid=item)
-    client = asyncio.run(get_client_async())
-    obj = asyncio.run(client.get(kind=tmp_hfid[0], hfid=tmp_hfid[1:], branch=get_instance_branch()))
-    return str(obj.id)
-    # # If it's not a Generic we gonna parse the HFID
-    # return parse_hfid(hfid=item)[1:]
-
-
-def parse_value(value: Union[str, List[str]], is_generic: bool) -> Union[str, List[str]]:
-    """Parse a single value, either a UUID, HFID, or a list."""
-    if isinstance(value, str):
-        return parse_item(item=value, is_generic=is_generic)
-    return value
-
-
-def parse_list_value(value: str, is_generic: bool) -> Union[str, List[Union[str, List[str]]]]:
-    """Convert list-like string to a list and parse items as UUIDs or HFIDs."""
-    parsed_value = literal_eval(value)
-    if isinstance(parsed_value, list):
-        return [parse_item(item=item, is_generic=is_generic) for item in parsed_value]
-    return value
+def resolve_references(df: pd.DataFrame, schema: NodeSchema) -> tuple[dict[Reference, str], list[Message]]:
+    """Resolve every HFID referenced in the file at once, reporting those matching no object."""
+    references = collect_references(df=df, schema=schema)
+    if not references:
+        return {}, []
+    try:
+        resolved = resolve_hfids(references=references, branch=get_instance_branch(), address=get_instance_address())
+    except GraphQLError as exc:
+        return {}, [Message(severity=MessageSeverity.ERROR, message=f"Unable to resolve the related nodes: {exc}")]
+    if resolved is None:
+        return {}, [Message(severity=MessageSeverity.ERROR, message="Unable to resolve the related nodes")]
+    errors = [
+        Message(severity=MessageSeverity.ERROR, message=f"Unable to find {kind} {'__'.join(hfid)!r}")
+        for kind, hfids in references.items()
+        for hfid in sorted(hfids)
+        if (kind, hfid) not in resolved
+    ]
+    return resolved, errors
 
 
 def validate_columns(df_columns: list, target_schema: NodeSchema) -> list[Message]:
@@ -89,59 +89,54 @@ def validate_columns(df_columns: list, target_schema: NodeSchema) -> list[Messag
 def preprocess_and_validate_data(
     df: pd.DataFrame,
     schema: NodeSchema,
-    branch_schemas: dict[str, MainSchemaTypes],
 ) -> tuple[pd.DataFrame, list[Message]]:
-    """Process DataFrame rows to handle HFIDs, UUIDs, and empty lists."""
+    """Process DataFrame columns to handle HFIDs, UUIDs, and empty lists."""
     errors = validate_columns(list(df.columns), schema)
-    processed_rows = []
-
-    for _, items_row in df.iterrows():
-        processed_row: dict[str, Any] = {}
-        for column, value in items_row.items():
-            if pd.isnull(value):
-                continue
-
-            if column in schema.relationship_names:
-                relation_schema = schema.get_relationship(column)
-                peer_schema = branch_schemas[relation_schema.peer]
-                is_generic = False
-                if isinstance(peer_schema, (GenericSchema, GenericSchemaAPI)):
-                    is_generic = True
-                # Process relationships for HFID or UUID
-                if isinstance(value, str) and value.startswith("[") and value.endswith("]"):
-                    processed_row[column] = parse_list_value(value=value, is_generic=is_generic)
-                else:
-                    processed_row[column] = parse_value(value=value, is_generic=is_generic)
-
-            elif column in schema.attribute_names:
-                # Directly use attribute values
-                processed_row[column] = value
-
-        processed_rows.append(processed_row)
-
-    prepocessed_df = pd.DataFrame(processed_rows)
-    return prepocessed_df, errors
-
-
-def process_and_save_with_batch(
-    data_frame: pd.DataFrame, kind: str, branch: str | None, st_msg: DeltaGenerator
+    resolved, resolution_errors = resolve_references(df=df, schema=schema)
+    errors.extend(resolution_errors)
+    return preprocess_dataframe(df=df, schema=schema, resolved=resolved), errors
+
+
+def show_concurrency_stats(stats: ConcurrencyStats, st_status: DeltaGenerator) -> None:
+    p95 = f"{stats.p95_latency * 1000:.0f} ms" if stats.p95_latency is not None else "-"
+    st_status.info(
+        f"{stats.throughput:.1f} objects/s, p95 latency {p95}, "
+        f"{stats.in_flight} in flight (limit {stats.limit}), {stats.completed} saved, {stats.failed} failed"
+    )
+
+
+def process_and_save_with_batch(  # pylint: disable=too-many-arguments
+    data_frame: pd.DataFrame,
+    kind: str,
+    branch: str | None,
+    st_msg: DeltaGenerator,
+    max_in_flight: int = IMPORT_MAX_IN_FLIGHT,
+    adaptive: bool = False,
 ) -> None:
-    """Process and save data frame rows with batch operations."""
+    """Process and save data frame rows with batch operations.
+
+    At most `max_in_flight` objects are saved concurrently, or an adaptive number of them up to it with
+    `adaptive`, the throughput and latency of the saves being displayed while they run.
+    """
     nbr_errors = 0
 
-    client = asyncio.run(get_client_async())
-    batch = asyncio.run(client.create_batch(return_exceptions=True))
+    limiter = ConcurrencyLimiter(max_in_flight=max_in_flight, adaptive=adaptive)
+    # The limiter bounds the saves in flight, so the batch itself mustn't bound them lower
+    batch = InfrahubBatch(max_concurrent_execution=limiter.max_in_flight, return_exceptions=True)
+    st_status = st.empty()
 
     # Process rows and add them to the batch
     for index, row in data_frame.iterrows():
         data = {key: value for key, value in dict(row).items() if not isinstance(value, float) or pd.notnull(value)}
         try:
-            print(f"data={data}")
+            logger.debug("Adding line %s to the batch: %s", index, data)
             create_and_add_to_batch(
                 branch=branch,
                 kind_name=kind,
                 data=data,
                 batch=batch,
+                limiter=limiter,
+                address=get_instance_address(),
             )
             data_frame.at[index, "Status"] = "ONGOING"
         except Exception as exc:  # pylint: disable=broad-exception-caught
@@ -152,7 +147,11 @@ def process_and_save_with_batch(
     # Execute the batch
     if batch.num_tasks > 0:
         try:
-            execute_batch(batch=batch)
+            execute_batch(
+                batch=batch,
+                limiter=limiter,
+                on_progress=partial(show_concurrency_stats, st_status=st_status),
+            )
         except Exception as exc:  # pylint: disable=broad-exception-caught
             nbr_errors += 1
             with st.expander(icon="⚠️", label="Item failed to be imported (execution)", expanded=False):
@@ -165,11 +164,71 @@ def process_and_save_with_batch(
         st_msg.toast(icon="✅", body="Loading completed with success")
 
 
+def display_streamed_import(uploaded_file: Any, schema: NodeSchema, kind: str) -> None:
+    """Display a preview of the file, then import it chunk by chunk while reporting the progress."""
+    try:
+        preview = pd.read_csv(filepath_or_buffer=uploaded_file, nrows=IMPORT_PREVIEW_ROWS)
+    except EmptyDataError as exc_error:
+        st.toast(icon="❌", body=f"{exc_error!s}")
+        return
+
+    errors = validate_columns(list(preview.columns), schema)
+    if errors:
+        st.toast(icon="❌", body=f".csv file is not valid for {kind}")
+        for error in errors:
+            st.toast(icon="⚠️", body=error.message)
+        return
+
+    st.caption(f"Preview of the first {len(preview)} rows, the whole file is processed during the import:")
+    st.dataframe(clean_chunk(preview), hide_index=True)
+    objects_per_request = st.number_input(
+        "Objects per request",
+        min_value=1,
+        max_value=1000,
+        value=IMPORT_OBJECTS_PER_REQUEST,
+        help="Objects upserted by a single mutation, which speeds up the import of many small objects.",
+    )
+    if not st.button("Import Data"):
+        return
+
+    status = st.empty()
+
+    def show_progress(progress: ImportProgress) -> None:
+        status.info(
+            f"{progress.rows_saved} objects saved, {progress.rows_failed} failed, {progress.rows_read} rows read"
+        )
+
+    uploaded_file.seek(0)
+    progress = import_csv(
+        source=uploaded_file,
+        kind=kind,
+        branch=get_instance_branch(),
+        address=get_instance_address(),
+        objects_per_request=int(objects_per_request),
+        on_progress=show_progress,
+    )
+    if progress is None:
+        st.session_state.infrahub_error_message = "Import failed"
+        handle_reachability_error(redirect=False)
+        return
+    show_progress(progress)
+    if progress.error:
+        st.error(f"Import stopped: {progress.error}")
+    if progress.errors:
+        st.toast(icon="❌", body=f"Loading completed with {progress.rows_failed} errors")
+        with st.expander(icon="⚠️", label=f"{len(progress.errors)} errors", expanded=False):
+            for message in progress.errors:
+                st.write(message)
+    elif not progress.error:
+        st.toast(icon="✅", body="Loading completed with success")
+
+
 set_page_config(title="Import Data")
 st.markdown("# Import Data from CSV file")
-menu_with_redirect()
+page_data = load_page_data(branch=get_instance_branch())
+menu_with_redirect(page_data=page_data)
 
-infrahub_schema = get_cached_schema(branch=st.session_state.infrahub_branch)
+infrahub_schema = page_data.infrahub_schema
 if not infrahub_schema:
     handle_reachability_error()
 
@@ -179,8 +238,14 @@ else:
     if selected_option:
         selected_schema = infrahub_schema[selected_option]
         uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
-
-        if uploaded_file is not None:
+        streaming = st.toggle(
+            "Streaming import",
+            help="For very large files: the file is read, processed and saved in chunks, with only a preview displayed.",
+        )
+
+        if uploaded_file is not None and streaming:
+            display_streamed_import(uploaded_file=uploaded_file, schema=selected_schema, kind=selected_option)
+        elif uploaded_file is not None:
             msg = st.toast(f"Loading file {uploaded_file}...")
             try:
                 dataframe = pd.read_csv(filepath_or_buffer=uploaded_file)
@@ -191,9 +256,7 @@ else:
                 st.stop()
 
             msg.toast("Comparing data to schema...")
-            processed_df, _errors = preprocess_and_validate_data(
-                df=dataframe, schema=selected_schema, branch_schemas=infrahub_schema
-            )
+            processed_df, _errors = preprocess_and_validate_data(df=dataframe, schema=selected_schema)
 
             if _errors:
                 msg.toast(icon="❌", body=f".csv file is not valid for {selected_option}")
@@ -201,9 +264,23 @@ else:
                     st.toast(icon="⚠️", body=error.message)
             else:
                 edited_df = st.data_editor(processed_df, hide_index=True)
+                max_in_flight_col, adaptive_col = st.columns(2)
+                max_in_flight = max_in_flight_col.number_input(
+                    "Max requests in flight", min_value=1, max_value=100, value=IMPORT_MAX_IN_FLIGHT
+                )
+                adaptive = adaptive_col.toggle(
+                    "Adaptive concurrency",
+                    help="Start low and raise the concurrency up to the maximum while latency stays healthy, "
+                    "halving it when the server times out or fails.",
+                )
 
                 if st.button("Import Data"):
                     msg.toast(body=f"Loading data for {selected_schema.namespace}{selected_schema.name}")
                     process_and_save_with_batch(
-                        data_frame=edited_df, kind=selected_option, branch=get_instance_branch(), st_msg=msg
+                        data_frame=edited_df,
+                        kind=selected_option,
+                        branch=get_instance_branch(),
+                        st_msg=msg,
+                        max_in_flight=int(max_in_flight),
+                        adaptive=adaptive,
                     )
@@ -14,7 +14,7 @@ from openai import OpenAI
 
 from emma.assistant_utils import generate_yaml
 from emma.gql_queries import generate_full_query, get_gql_schema
-from emma.infrahub import run_gql_query
+from emma.infrahub import get_instance_address, run_gql_query
 from emma.streamlit_utils import handle_reachability_error, set_page_config
 from menu import menu_with_redirect
 
@@ -234,7 +234,9 @@ with col1:
         assistant_messages = [m for m in st.session_state.query_messages if m["role"] == "assistant"]
         try:
             query_check_result = run_gql_query(
-                branch=st.session_state.infrahub_branch, query=st.session_state.combined_code
+                branch=st.session_state.infrahub_branch,
+                query=st.session_state.combined_code,
+                address=get_instance_address(),
             )
 
             message = f"""Query is valid!
@@ -11,7 +11,7 @@ from langchain_community.agents.openai_assistant import OpenAIAssistantV2Runnabl
 from openai import OpenAI
 
 from emma.assistant_utils import generate_yaml
-from emma.infrahub import check_schema, get_cached_schema
+from emma.infrahub import check_schema, get_instance_address, get_schema
 from emma.streamlit_utils import handle_reachability_error, set_page_config
 from menu import menu_with_redirect
 
@@ -178,7 +178,7 @@ if st.sidebar.button("New Chat", disabled=buttons_disabled):
     st.rerun()
 
 if "infrahub_schema_fid" not in st.session_state:
-    infrahub_schema = get_cached_schema(st.session_state.infrahub_branch)
+    infrahub_schema = get_schema(st.session_state.infrahub_branch)
     if not infrahub_schema:
         handle_reachability_error()
     else:
@@ -287,7 +287,9 @@ with col1:
         assistant_messages = [m for m in st.session_state.messages if m["role"] == "assistant"]
 
         schema_check_result = check_schema(
-            branch=st.session_state.infrahub_branch, schemas=[yaml.safe_load(st.session_state.combined_code)]
+            branch=st.session_state.infrahub_branch,
+            schemas=[yaml.safe_load(st.session_state.combined_code)],
+            address=get_instance_address(),
         )
         if schema_check_result:
             if schema_check_result.success:
@@ -299,7 +301,7 @@ with col1:
 
                 # Sometimes the schema will fail to parse at all (like if extensions is an empty list)
                 if not errors:
-                    errors = schema_check_result.response.get("detail")
+                    errors = schema_check_result.response.get("detail") or []
 
                 errors_out = translate_errors(schema_errors=errors)
                 st.session_state.schema_errors = errors_out  # Store errors in session state
@@ -1,4 +1,3 @@
-import asyncio
 import os
 import re
 from datetime import datetime
@@ -20,7 +19,7 @@ from infrahub_sdk.yaml import SchemaFile
 
 from emma.git_utils import SCHEMA_LIBRARY_REFRESH_INTERVAL, get_repo
 from emma.infrahub import (
-    get_schema_async,
+    get_schema,
     load_schema,
     load_schemas_from_disk,
 )
@@ -63,7 +62,7 @@ if not st.session_state.repo["local_path"]:
     st.session_state.repo["local_path"] = _local_path
 
 
-async def init_schema_extension_state(schema_extension: str) -> None:
+def init_schema_extension_state(schema_extension: str) -> None:
     # Check if the extension is already in the session state
     if schema_extension not in st.session_state.extensions_states:
         st.session_state.extensions_states[schema_extension] = SchemaState.NOT_LOADED
@@ -72,7 +71,7 @@ async def init_schema_extension_state(schema_extension: str) -> None:
     # TODO: This accounts for qinq that only has a schema extension and no schema kinds. We need to account for node extensions here as well.
     if not schema_kinds:
         return
-    existing_schemas = await get_schema_async(refresh=True)
+    existing_schemas = get_schema(branch=st.session_state.infrahub_branch, refresh=True)
     if existing_schemas:
         if schema_kinds.issubset(existing_schemas):
             st.session_state.extensions_states[schema_extension] = SchemaState.LOADED
@@ -267,7 +266,7 @@ with st.container(border=True):
     base_schemas = load_schemas_from_disk(schemas=[schema_base_path])
     # Registering base schema kinds
     register_schema_kinds(schema_extension=schema_base_path.name, schemas=base_schemas)
-    asyncio.run(init_schema_extension_state(schema_base_name))
+    init_schema_extension_state(schema_base_name)
 
     # Render container content
     render_schema_extension_content(schema_base_path, schema_base_name, base_schemas)
@@ -291,7 +290,7 @@ with st.container(border=True):
                     # schema_extension_path: Path = Path(f"{extensions_folder_path}/{schema_extension_name}")
                     extension_schemas = load_schemas_from_disk(schemas=[schema_extension_path])
                     register_schema_kinds(schema_extension=schema_extension_path.name, schemas=extension_schemas)
-                    asyncio.run(init_schema_extension_state(schema_extension_path.name))
+                    init_schema_extension_state(schema_extension_path.name)
 
                     # Each extension is packaged as a folder ...
                     if os.path.isdir(schema_extension_path):
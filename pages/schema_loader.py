@@ -3,6 +3,7 @@ import yaml
 
 from emma.infrahub import (
     check_schema,
+    get_instance_address,
     load_schema,
 )
 from emma.streamlit_utils import set_page_config
@@ -63,7 +64,9 @@ if st.session_state.uploaded_files and len(st.session_state.uploaded_files) > 0:
 
     with preview_container.status("Schema check ...") as preview_status:
         # Then check schema over Infrahub instance
-        schema_check_result = check_schema(branch=st.session_state.infrahub_branch, schemas=st.session_state.schemas)
+        schema_check_result = check_schema(
+            branch=st.session_state.infrahub_branch, schemas=st.session_state.schemas, address=get_instance_address()
+        )
 
         if schema_check_result:
             # If something went wrong
@@ -98,7 +101,9 @@ if apply_button and st.session_state.is_upload_valid:
         result_status.update(expanded=True)
 
         st.write("Calling Infrahub API...")
-        response = load_schema(branch=st.session_state.infrahub_branch, schemas=st.session_state.schemas)
+        response = load_schema(
+            branch=st.session_state.infrahub_branch, schemas=st.session_state.schemas, address=get_instance_address()
+        )
         st.write("Computing results...")
 
         if response:
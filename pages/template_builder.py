@@ -11,7 +11,7 @@ from langchain_community.agents.openai_assistant import OpenAIAssistantV2Runnabl
 from openai import OpenAI
 
 from emma.assistant_utils import generate_yaml
-from emma.infrahub import run_gql_query
+from emma.infrahub import get_instance_address, run_gql_query
 from emma.streamlit_utils import set_page_config
 from menu import menu_with_redirect
 
@@ -148,7 +148,9 @@ if st.button("Run GQL Query") and st.session_state.gql_query:
     with st.spinner("Running your GQL query..."):
         try:
             st.session_state.gql_data = run_gql_query(
-                branch=st.session_state.infrahub_branch, query=st.session_state.gql_query
+                branch=st.session_state.infrahub_branch,
+                query=st.session_state.gql_query,
+                address=get_instance_address(),
             )
             st.session_state.query_errors = None
         except GraphQLError as e:
@@ -0,0 +1,210 @@
+"""Tests for emma.cache_utils module."""
+
+import asyncio
+
+import pandas as pd
+import pytest
+
+from emma.cache_utils import PartitionedCache, SingleFlight, estimate_size
+
+
+class TestSingleFlight:
+    """Test SingleFlight request coalescing."""
+
+    def test_concurrent_calls_share_result(self):
+        """Test that identical concurrent calls run the function once."""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        async def run():
+            flight = SingleFlight()
+            results = await asyncio.gather(*[flight.do("key", fetch) for _ in range(5)])
+            return flight, results
+
+        flight, results = asyncio.run(run())
+
+        assert calls == [1]
+        assert all(result is results[0] for result in results)
+        assert flight.coalesced == 4
+        assert flight.in_flight() == 0
+
+    def test_different_keys_are_not_coalesced(self):
+        """Test that calls with different keys run independently."""
+        calls = []
+
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0)
+            return key
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b")))
+
+        assert asyncio.run(run()) == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_sequential_calls_are_not_coalesced(self):
+        """Test that a finished call is not reused by later callers."""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            flight = SingleFlight()
+            return [await flight.do("key", fetch), await flight.do("key", fetch)]
+
+        assert asyncio.run(run()) == [1, 2]
+
+    def test_exception_is_shared(self):
+        """Test that every waiting caller receives the exception."""
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that one caller giving up doesn't cancel the shared call."""
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def run():
+            flight = SingleFlight()
+            impatient = asyncio.ensure_future(flight.do("key", fetch))
+            patient = asyncio.ensure_future(flight.do("key", fetch))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await impatient
+            return await patient
+
+        assert asyncio.run(run()) == "done"
+
+
+class TestPartitionedCache:
+    """Test the address and branch partitioned cache."""
+
+    @pytest.fixture
+    def cache(self):
+        cache = PartitionedCache()
+        cache.set("http://prod:8000", "main", "schema", 1)
+        cache.set("http://prod:8000", "dev", "schema", 2)
+        cache.set("http://lab:8000", "main", "schema", 3)
+        return cache
+
+    def test_entries_are_isolated_per_partition(self, cache):
+        """Test that the same key is stored separately per address and branch."""
+        assert cache.get("http://prod:8000/", "main", "schema") == 1
+        assert cache.get("http://prod:8000", "dev", "schema") == 2
+        assert cache.get("http://lab:8000", "dev", "schema") is None
+        assert len(cache) == 3
+
+    def test_invalidate_branch(self, cache):
+        """Test that invalidating a branch keeps the other branches and instances."""
+        assert cache.invalidate("http://prod:8000", branch="dev") == 1
+
+        assert cache.get("http://prod:8000", "dev", "schema") is None
+        assert cache.get("http://prod:8000", "main", "schema") == 1
+
+    def test_invalidate_address(self, cache):
+        """Test that invalidating an address drops all of its branches only."""
+        assert cache.invalidate("http://prod:8000") == 2
+
+        assert cache.get("http://lab:8000", "main", "schema") == 3
+        assert len(cache) == 1
+
+    def test_usage_is_accounted_per_address(self):
+        """Test that the measured size of the entries is reported for each address, until they are removed."""
+        cache = PartitionedCache(max_size=2**30)
+        cache.set("http://prod:8000", "main", "schema", 1)
+        cache.set("http://lab:8000", "main", "objects", pd.DataFrame({"name": ["device"] * 1000}))
+
+        usage = cache.usage()
+
+        assert set(usage) == {"http://prod:8000", "http://lab:8000"}
+        assert usage["http://lab:8000"] > usage["http://prod:8000"]
+        assert sum(usage.values()) == cache.stats()["size"]
+        cache.invalidate("http://lab:8000")
+        assert set(cache.usage()) == {"http://prod:8000"}
+
+
+class TestBoundedPartitionedCache:
+    """Test the byte budget, expiry and counters of the partitioned cache."""
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test that entries are evicted least recently used first to stay within the budget."""
+        cache = PartitionedCache(max_size=estimate_size("x" * 1000) * 2)
+        cache.set("http://prod:8000", "main", "first", "x" * 1000)
+        cache.set("http://prod:8000", "dev", "second", "y" * 1000)
+        cache.get("http://prod:8000", "main", "first")
+        cache.set("http://lab:8000", "main", "third", "z" * 1000)
+
+        assert cache.get("http://prod:8000", "dev", "second") is None
+        assert cache.get("http://prod:8000", "main", "first") == "x" * 1000
+        assert cache.stats() == {
+            "entries": 2,
+            "size": estimate_size("x" * 1000) * 2,
+            "hits": 2,
+            "misses": 1,
+            "evictions": 1,
+        }
+
+    def test_oversized_values_are_not_stored(self):
+        """Test that a value larger than the whole budget doesn't evict everything else."""
+        cache = PartitionedCache(max_size=2000)
+        cache.set("http://prod:8000", "main", "small", "x")
+        cache.set("http://prod:8000", "main", "large", "x" * 5000)
+
+        assert cache.get("http://prod:8000", "main", "large") is None
+        assert cache.get("http://prod:8000", "main", "small") == "x"
+
+    def test_entries_expire(self, monkeypatch):
+        """Test that entries are dropped once their time to live has passed."""
+        now = [100.0]
+        monkeypatch.setattr("emma.cache_utils.time.monotonic", lambda: now[0])
+        cache = PartitionedCache(ttl=60)
+        cache.set("http://prod:8000", "main", "objects", 1)
+
+        now[0] += 59
+        assert cache.get("http://prod:8000", "main", "objects") == 1
+        now[0] += 1
+        assert cache.get("http://prod:8000", "main", "objects") is None
+        assert len(cache) == 0
+
+    def test_values_are_shared_by_reference(self):
+        """Test that every caller gets the cached value itself rather than a copy."""
+        cache = PartitionedCache(max_size=10_000_000)
+        df = pd.DataFrame({"name": ["device"] * 10})
+        cache.set("http://prod:8000", "main", "objects", df)
+
+        assert cache.get("http://prod:8000", "main", "objects") is df
+
+
+class TestEstimateSize:
+    """Test the memory estimate of cached values."""
+
+    def test_follows_containers(self):
+        """Test that nested values are counted."""
+        assert estimate_size({"key": ["x" * 1000]}) > 1000
+
+    def test_shared_values_are_counted_once(self):
+        """Test that a value referenced twice is only counted once."""
+        value = "x" * 1000
+
+        assert estimate_size([value, value]) < 2000
@@ -0,0 +1,88 @@
+"""Tests for emma.concurrency_utils."""
+
+import asyncio
+
+import httpx
+import pytest
+from infrahub_sdk.exceptions import GraphQLError, ServerNotResponsiveError
+
+from emma.concurrency_utils import ConcurrencyLimiter, is_overload
+
+
+async def call(running, peaks, delay=0.01, error=None):
+    running.append(None)
+    peaks.append(len(running))
+    await asyncio.sleep(delay)
+    running.pop()
+    if error:
+        raise error
+
+
+class TestConcurrencyLimiter:
+    """Test the static and adaptive limits of the calls in flight."""
+
+    def test_static_limit(self):
+        """Test that no more calls than the maximum are in flight, and that they are all counted."""
+        limiter = ConcurrencyLimiter(max_in_flight=3)
+        running, peaks = [], []
+
+        async def run():
+            await asyncio.gather(*(limiter.run(call, running, peaks) for _ in range(20)))
+
+        asyncio.run(run())
+
+        assert max(peaks) == 3
+        stats = limiter.stats()
+        assert (stats.completed, stats.failed, stats.in_flight, stats.limit) == (20, 0, 0, 3)
+        assert stats.throughput > 0
+        assert stats.p95_latency >= 0.01
+
+    def test_adaptive_limit_grows_while_healthy(self):
+        """Test that the adaptive limit starts low and grows up to the maximum while latency stays stable."""
+        limiter = ConcurrencyLimiter(max_in_flight=4, adaptive=True)
+        running, peaks = [], []
+
+        async def run():
+            await asyncio.gather(*(limiter.run(call, running, peaks) for _ in range(40)))
+
+        asyncio.run(run())
+
+        assert peaks[0] == 1
+        assert max(peaks) == 4
+        assert limiter.limit == 4
+
+    def test_adaptive_limit_backs_off_once_per_burst(self):
+        """Test that a burst of timeouts halves the limit once, and that other errors don't back off."""
+        limiter = ConcurrencyLimiter(max_in_flight=8, adaptive=True)
+        limiter._limit = 8.0
+        running, peaks = [], []
+
+        async def run():
+            timeouts = [
+                limiter.run(call, running, peaks, error=ServerNotResponsiveError(url="http://infrahub:8000"))
+                for _ in range(8)
+            ]
+            return await asyncio.gather(*timeouts, return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, ServerNotResponsiveError) for result in results)
+        assert (limiter.limit, limiter.backoffs, limiter.failed) == (4, 1, 8)
+
+        with pytest.raises(GraphQLError):
+            asyncio.run(limiter.run(call, running, peaks, error=GraphQLError(errors=[])))
+        assert limiter.limit == 4
+
+
+class TestIsOverload:
+    """Test the errors considered as the server being overloaded."""
+
+    def test_overload_errors(self):
+        """Test that timeouts and server-side HTTP errors are overloads, and not rejected data."""
+        request = httpx.Request("POST", "http://infrahub:8000/graphql")
+
+        assert is_overload(ServerNotResponsiveError(url="http://infrahub:8000"))
+        assert is_overload(httpx.HTTPStatusError("", request=request, response=httpx.Response(503)))
+        assert not is_overload(httpx.HTTPStatusError("", request=request, response=httpx.Response(404)))
+        assert not is_overload(GraphQLError(errors=[]))
+        assert not is_overload(ValueError("invalid"))
@@ -0,0 +1,266 @@
+"""Tests for emma.export_utils module."""
+
+import io
+import ipaddress
+import json
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from infrahub_sdk.schema import NodeSchemaAPI
+
+from emma.export_utils import (
+    CsvExportWriter,
+    ExportArchive,
+    ParquetExportWriter,
+    build_dataframe,
+    build_projection_query,
+    column_dtypes,
+    dataframe_to_parquet,
+    node_to_row,
+    peer_to_string,
+)
+
+
+@pytest.fixture
+def device_schema():
+    return NodeSchemaAPI(
+        name="Device",
+        namespace="Infra",
+        attributes=[{"name": "name", "kind": "Text"}, {"name": "description", "kind": "Text", "optional": True}],
+        relationships=[
+            {"name": "site", "peer": "LocationSite", "cardinality": "one"},
+            {"name": "tags", "peer": "BuiltinTag", "cardinality": "many", "optional": True},
+        ],
+    )
+
+
+class TestBuildProjectionQuery:
+    """Test the projection query generated from a schema."""
+
+    def test_query_contains_attributes_and_peers(self, device_schema):
+        """Test that attributes are fetched by value and related nodes by reference only."""
+        query = build_projection_query(schema=device_schema, offset=50, limit=50)
+
+        assert "InfraDevice(offset: 50, limit: 50)" in query
+        assert "count" in query
+        assert query.count("__typename") == 2
+        assert query.count("hfid") == 2
+
+    def test_query_without_id(self, device_schema):
+        """Test that the node ID is only requested when included."""
+        query = build_projection_query(schema=device_schema, offset=0, limit=50, include_id=False)
+
+        node = query.split("node {", 1)[1]
+        assert node.split()[0] != "id"
+
+    def test_query_only_selected_columns(self, device_schema):
+        """Test that omitted attributes and relationships are not queried."""
+        query = build_projection_query(schema=device_schema, offset=0, limit=50, columns=["name", "site"])
+
+        assert "site" in query
+        assert "description" not in query
+        assert "tags" not in query
+
+
+class TestNodeToRow:
+    """Test the conversion of projection query responses to rows."""
+
+    def test_peer_to_string(self):
+        """Test that peers are referenced by kind and HFID, or by ID without HFID."""
+        assert peer_to_string({"id": "1", "hfid": ["paris"], "__typename": "LocationSite"}) == "LocationSite__paris"
+        assert peer_to_string({"id": "1", "hfid": ["a", "b"], "__typename": "InfraInterface"}) == "InfraInterface__a__b"
+        assert peer_to_string({"id": "1", "hfid": None, "__typename": "BuiltinTag"}) == "1"
+
+    def test_node_to_row(self, device_schema):
+        """Test that a node is converted to a flat row."""
+        node = {
+            "id": "device-1",
+            "name": {"value": "atl1-edge1"},
+            "description": {"value": None},
+            "site": {"node": {"id": "site-1", "hfid": ["atl1"], "__typename": "LocationSite"}},
+            "tags": {"edges": [{"node": {"id": "tag-1", "hfid": ["red"], "__typename": "BuiltinTag"}}]},
+        }
+
+        assert node_to_row(schema=device_schema, node=node) == {
+            "index": "device-1",
+            "name": "atl1-edge1",
+            "description": None,
+            "site": "LocationSite__atl1",
+            "tags": ["BuiltinTag__red"],
+        }
+
+    def test_node_to_row_without_peers(self, device_schema):
+        """Test that empty relationships are converted to None or an empty list."""
+        node = {
+            "name": {"value": "atl1-edge1"},
+            "description": {"value": None},
+            "site": {"node": None},
+            "tags": {"edges": []},
+        }
+
+        row = node_to_row(schema=device_schema, node=node, include_id=False)
+
+        assert "index" not in row
+        assert row["site"] is None
+        assert row["tags"] == []
+
+    def test_node_to_row_selected_columns(self, device_schema):
+        """Test that rows only hold the selected columns."""
+        node = {"id": "device-1", "name": {"value": "atl1-edge1"}}
+
+        assert node_to_row(schema=device_schema, node=node, columns=["name"]) == {
+            "index": "device-1",
+            "name": "atl1-edge1",
+        }
+
+
+class TestBuildDataframe:
+    """Test the schema-driven DataFrame column types."""
+
+    @pytest.fixture
+    def interface_schema(self):
+        return NodeSchemaAPI(
+            name="Interface",
+            namespace="Infra",
+            attributes=[
+                {"name": "name", "kind": "Text"},
+                {"name": "mtu", "kind": "Number", "optional": True},
+                {"name": "enabled", "kind": "Boolean", "optional": True},
+                {"name": "status", "kind": "Dropdown", "choices": [{"name": "active"}], "optional": True},
+                {"name": "role", "kind": "Text", "enum": ["core", "edge"], "optional": True},
+                {"name": "address", "kind": "IPHost", "optional": True},
+            ],
+        )
+
+    def test_column_dtypes(self, interface_schema):
+        """Test that the dtypes follow the kinds of the attributes."""
+        assert column_dtypes(schema=interface_schema) == {
+            "mtu": "Int64",
+            "enabled": "boolean",
+            "status": "category",
+            "role": "category",
+            "address": "string",
+        }
+        assert column_dtypes(schema=interface_schema, columns=["name", "mtu"]) == {"mtu": "Int64"}
+
+    def test_build_dataframe(self, interface_schema):
+        """Test that missing values keep integer and boolean columns typed, and IP addresses become strings."""
+        rows = [
+            {"name": "eth0", "mtu": 1500, "enabled": True, "status": "active", "role": "core", "address": None},
+            {
+                "name": "eth1",
+                "mtu": None,
+                "enabled": None,
+                "status": "active",
+                "role": "edge",
+                "address": ipaddress.ip_interface("10.0.0.1/24"),
+            },
+        ]
+
+        df = build_dataframe(schema=interface_schema, rows=rows)
+
+        assert str(df["mtu"].dtype) == "Int64"
+        assert str(df["enabled"].dtype) == "boolean"
+        assert str(df["status"].dtype) == "category"
+        assert df["address"].tolist()[1] == "10.0.0.1/24"
+        assert df.to_csv(index=False).splitlines()[2] == "eth1,,,active,edge,10.0.0.1/24"
+
+
+EXPORT_ROWS = [
+    {"name": "atl1-edge1", "description": None, "site": "LocationSite__atl1", "tags": ["BuiltinTag__red"]},
+    {"name": "atl1, edge2", "description": "spare", "site": None, "tags": []},
+]
+
+
+class TestCsvExportWriter:
+    """Test the incremental CSV export writer."""
+
+    def test_matches_dataframe_csv(self, device_schema):
+        """Test that rows written page by page give the same file as `DataFrame.to_csv`."""
+        writer = CsvExportWriter(columns=["name", "site", "tags"], schema=device_schema)
+        for row in EXPORT_ROWS:
+            writer.write_rows([row])
+        writer.finish()
+
+        expected = pd.DataFrame(EXPORT_ROWS)[["name", "site", "tags"]].to_csv(index=False, lineterminator="\n")
+        assert writer.read().decode("utf-8") == expected
+        assert writer.rows == 2
+
+    def test_preview_is_bounded(self, device_schema):
+        """Test that only the first rows are kept for the preview."""
+        writer = CsvExportWriter(columns=["name"], schema=device_schema, preview_rows=3)
+        for index in range(10):
+            writer.write_rows([{"name": f"device-{index}"}, {"name": f"device-{index}-bis"}])
+
+        assert list(writer.preview_df()["name"]) == ["device-0", "device-0-bis", "device-1"]
+        assert writer.rows == 20
+
+
+class TestParquetExport:
+    """Test the typed Parquet exports."""
+
+    def test_streamed_parquet_keeps_types(self, device_schema, monkeypatch):
+        """Test that rows written page by page across row groups are read back with their types."""
+        monkeypatch.setattr("emma.export_utils.PARQUET_ROW_GROUP_SIZE", 2)
+        writer = ParquetExportWriter(columns=["name", "site", "tags"], schema=device_schema)
+        for _ in range(3):
+            writer.write_rows(EXPORT_ROWS)
+        writer.finish()
+
+        parquet_file = pq.ParquetFile(io.BytesIO(writer.read()))
+        table = parquet_file.read()
+
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.metadata.row_group(0).column(0).compression == "ZSTD"
+        assert table.num_rows == 6
+        assert table.schema.field("tags").type == pa.list_(pa.string())
+        assert table.column("site").to_pylist()[:2] == ["LocationSite__atl1", None]
+
+    def test_dataframe_to_parquet(self):
+        """Test that a typed DataFrame is written with matching Arrow types."""
+        schema = NodeSchemaAPI(
+            name="Interface",
+            namespace="Infra",
+            attributes=[
+                {"name": "mtu", "kind": "Number", "optional": True},
+                {"name": "status", "kind": "Dropdown", "choices": [{"name": "up"}], "optional": True},
+                {"name": "data", "kind": "JSON", "optional": True},
+            ],
+        )
+        rows = [{"mtu": 1500, "status": "up", "data": {"vlan": 10}}, {"mtu": None, "status": None, "data": None}]
+        df = build_dataframe(schema=schema, rows=rows)
+
+        table = pq.read_table(io.BytesIO(dataframe_to_parquet(df=df, schema=schema, columns=["mtu", "status", "data"])))
+
+        assert table.schema.field("mtu").type == pa.int64()
+        assert pa.types.is_dictionary(table.schema.field("status").type)
+        assert table.column("mtu").to_pylist() == [1500, None]
+        assert table.column("data").to_pylist() == ['{"vlan": 10}', None]
+
+
+class TestExportArchive:
+    """Test the zip archive of per-kind export files."""
+
+    def test_files_and_manifest(self, device_schema):
+        """Test that each kind gets a file and a manifest entry, Parquet files being stored uncompressed."""
+        archive = ExportArchive(address="http://infrahub:8000", branch="main", file_format="parquet")
+        writer = ParquetExportWriter(columns=["name", "site", "tags"], schema=device_schema)
+        writer.write_rows(EXPORT_ROWS)
+        writer.finish()
+        archive.add(kind="InfraDevice", writer=writer, seconds=0.5)
+        archive.add_error(kind="InfraCircuit", error="Unknown kind")
+        archive.finish()
+
+        with zipfile.ZipFile(io.BytesIO(archive.read())) as zip_file:
+            manifest = json.loads(zip_file.read("manifest.json"))
+            assert zip_file.getinfo("InfraDevice.parquet").compress_type == zipfile.ZIP_STORED
+            assert pq.read_table(io.BytesIO(zip_file.read("InfraDevice.parquet"))).num_rows == 2
+
+        assert manifest["branch"] == "main"
+        assert manifest["kinds"] == [
+            {"kind": "InfraDevice", "file": "InfraDevice.parquet", "rows": 2, "seconds": 0.5},
+            {"kind": "InfraCircuit", "file": None, "rows": None, "error": "Unknown kind"},
+        ]
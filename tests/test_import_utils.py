@@ -0,0 +1,134 @@
+"""Tests for emma.import_utils."""
+
+import pandas as pd
+import pytest
+from infrahub_sdk.schema import NodeSchemaAPI
+
+from emma.import_utils import (
+    build_hfid_lookup_query,
+    collect_references,
+    map_upsert_errors,
+    parse_reference,
+    preprocess_dataframe,
+    split_cell,
+)
+
+
+@pytest.fixture
+def interface_schema():
+    return NodeSchemaAPI(
+        name="Interface",
+        namespace="Infra",
+        attributes=[{"name": "name", "kind": "Text"}],
+        relationships=[
+            {"name": "device", "peer": "InfraDevice", "cardinality": "one"},
+            {"name": "tags", "peer": "BuiltinTag", "cardinality": "many", "optional": True},
+        ],
+    )
+
+
+class TestParseReference:
+    """Test the parsing of related node references."""
+
+    def test_kind_and_hfid(self):
+        """Test that a `<kind>__<hfid>` reference is split into its kind and HFID."""
+        assert parse_reference("InfraDevice__atl1__edge1", peer_kind="InfraGenericDevice") == (
+            "InfraDevice",
+            ("atl1", "edge1"),
+        )
+
+    def test_bare_hfid_uses_peer_kind(self):
+        """Test that a reference without kind is looked up in the peer kind."""
+        assert parse_reference("red", peer_kind="BuiltinTag") == ("BuiltinTag", ("red",))
+
+    def test_uuid_needs_no_resolution(self):
+        """Test that IDs are not references to resolve."""
+        assert parse_reference("a4c9f2d4-0f4b-4a38-9a8c-6d5a3c1e2b7f", peer_kind="BuiltinTag") is None
+
+    def test_split_list_cell(self):
+        """Test that list-like cells are split into their items."""
+        assert split_cell("['red', 'blue']") == ["red", "blue"]
+        assert split_cell('["InfraDevice__atl1, edge", "red"]') == ["InfraDevice__atl1, edge", "red"]
+        assert split_cell("[red, blue]") == ["red", "blue"]
+        assert split_cell("red") == ["red"]
+
+
+class TestCollectReferences:
+    """Test the collection of the distinct references of an import file."""
+
+    def test_distinct_hfids_by_kind(self, interface_schema):
+        """Test that each HFID is collected once per kind, across rows and list cells."""
+        df = pd.DataFrame(
+            {
+                "name": ["eth0", "eth1", "eth2"],
+                "device": ["InfraDevice__atl1", "InfraDevice__atl1", "InfraDevice__ord1"],
+                "tags": ["['red', 'blue']", "['red']", None],
+            }
+        )
+
+        assert collect_references(df=df, schema=interface_schema) == {
+            "InfraDevice": {("atl1",), ("ord1",)},
+            "BuiltinTag": {("red",), ("blue",)},
+        }
+
+
+class TestPreprocessDataframe:
+    """Test the column-oriented preprocessing of import files."""
+
+    def test_references_are_resolved_per_column(self, interface_schema):
+        """Test that HFIDs are replaced with IDs, unknown columns dropped and unresolved HFIDs kept."""
+        df = pd.DataFrame(
+            {
+                "name": ["eth0", "eth1", "eth2"],
+                "device": ["InfraDevice__atl1", "InfraDevice__atl1", "InfraDevice__ord1"],
+                "tags": ["['red', 'blue']", None, "['red']"],
+                "comment": ["a", "b", "c"],
+            }
+        )
+        resolved = {
+            ("InfraDevice", ("atl1",)): "device-1",
+            ("BuiltinTag", ("red",)): "tag-1",
+            ("BuiltinTag", ("blue",)): "tag-2",
+        }
+
+        processed = preprocess_dataframe(df=df, schema=interface_schema, resolved=resolved)
+
+        assert list(processed.columns) == ["name", "device", "tags"]
+        assert list(processed["device"]) == ["device-1", "device-1", "InfraDevice__ord1"]
+        assert processed["tags"][0] == ["tag-1", "tag-2"]
+        assert pd.isna(processed["tags"][1])
+
+    def test_empty_columns_are_dropped(self, interface_schema):
+        """Test that a column without any value is left out, as if it wasn't in the file."""
+        df = pd.DataFrame({"name": ["eth0"], "tags": [None]})
+
+        assert list(preprocess_dataframe(df=df, schema=interface_schema, resolved={}).columns) == ["name"]
+
+
+class TestBuildHfidLookupQuery:
+    """Test the aliased HFID lookup queries."""
+
+    def test_one_alias_per_hfid(self):
+        """Test that every HFID gets its own aliased field in a single query."""
+        query = build_hfid_lookup_query(kind="InfraDevice", hfids=[("atl1", "edge1"), ("ord1", "edge1")])
+
+        assert 'hfid0: InfraDevice(hfid: ["atl1", "edge1"])' in query
+        assert 'hfid1: InfraDevice(hfid: ["ord1", "edge1"])' in query
+        assert query.startswith("query {")
+
+
+class TestMapUpsertErrors:
+    """Test the mapping of the errors of an aliased upsert mutation to its objects."""
+
+    def test_errors_are_mapped_to_their_object(self):
+        """Test that errors are mapped to the position of the object whose alias starts their path."""
+        errors = [
+            {"message": "duplicate", "path": ["upsert3", "object"]},
+            {"message": "invalid", "path": ["upsert0"]},
+        ]
+
+        assert map_upsert_errors(errors) == {3: "duplicate", 0: "invalid"}
+
+    def test_document_errors_are_not_mapped(self):
+        """Test that an error outside of the aliased fields rejects the whole mutation."""
+        assert map_upsert_errors([{"message": "invalid", "path": ["upsert0"]}, {"message": "syntax error"}]) is None
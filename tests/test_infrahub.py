@@ -1,13 +1,72 @@
-"""Tests for get_version_async and run_gql_query in emma.infrahub."""
+"""Tests for emma.infrahub helpers."""
 
 import asyncio
+import inspect
+import io
+import json
+import threading
+import zipfile
 from unittest.mock import AsyncMock, MagicMock
 
 import httpx
+import pandas as pd
 import pytest
-from infrahub_sdk.exceptions import GraphQLError
+from infrahub_sdk.batch import InfrahubBatch
+from infrahub_sdk.branch import BranchData
+from infrahub_sdk.exceptions import GraphQLError, ServerNotReachableError, ServerNotResponsiveError
+from infrahub_sdk.schema import NodeSchemaAPI
 
-from emma.infrahub import get_version_async, run_gql_query
+from emma import infrahub
+from emma.cache_utils import PartitionedCache
+from emma.concurrency_utils import ConcurrencyLimiter
+from emma.export_utils import CsvExportWriter
+from emma.infrahub import (
+    SYNC_CALL_TIMEOUT,
+    BackgroundLoop,
+    PeerResolver,
+    call_in_script_thread,
+    check_reachability_async,
+    close_idle_clients,
+    create_branch,
+    execute_batch,
+    export_archive,
+    export_objects,
+    get_branches_async,
+    get_client_async,
+    get_objects_as_df,
+    get_schema_async,
+    get_version_async,
+    import_csv,
+    load_page_data_async,
+    refresh_export,
+    resolve_hfids,
+    run_async,
+    run_gql_query,
+    run_sync,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_shared_state(monkeypatch):
+    """Give each test its own client registry, health states and caches."""
+    monkeypatch.setattr(infrahub, "_CLIENTS", {})
+    monkeypatch.setattr(infrahub, "_REQUESTERS", {})
+    monkeypatch.setattr(infrahub, "_HEALTH", {})
+    monkeypatch.setattr(infrahub, "_SCHEMA_CACHE", PartitionedCache())
+    monkeypatch.setattr(infrahub, "_BRANCH_CACHE", PartitionedCache())
+    monkeypatch.setattr(infrahub, "OBJECTS_CACHE", PartitionedCache())
+
+
+@pytest.fixture
+def infrahub_client(monkeypatch):
+    """Mocked client of a reachable instance, returned for any address."""
+    client = MagicMock()
+    client.address = "http://infrahub:8000"
+    client.pagination_size = 2
+    client.max_concurrent_execution = 2
+    monkeypatch.setattr("emma.infrahub.get_client_async", AsyncMock(return_value=client))
+    monkeypatch.setattr("emma.infrahub.check_reachability_async", AsyncMock(return_value=True))
+    return client
 
 
 class TestGetVersionAsync:
@@ -108,3 +167,860 @@ class TestRunGqlQuery:
         result = asyncio.run(run_gql_query.__wrapped__("{ Q }"))
 
         assert result == {}
+
+
+class TestGetClientAsync:
+    """Test the pooled client registry."""
+
+    def test_same_key_returns_same_client(self):
+        """Test that the same address and branch reuse the pooled client."""
+        first = asyncio.run(get_client_async(address="http://infrahub:8000", branch="main"))
+        second = asyncio.run(get_client_async(address="http://infrahub:8000/", branch="main"))
+
+        assert first is second
+
+    def test_branches_share_requester(self):
+        """Test that clients for different branches share the connection pool of their address."""
+        main = asyncio.run(get_client_async(address="http://infrahub:8000", branch="main"))
+        dev = asyncio.run(get_client_async(address="http://infrahub:8000", branch="dev"))
+
+        assert main is not dev
+        assert dev.default_branch == "dev"
+        assert main.config.requester is dev.config.requester
+
+    def test_close_idle_clients_keeps_busy_pools(self):
+        """Test that only clients whose pools are idle, with no request in flight, are dropped."""
+        idle = asyncio.run(get_client_async(address="http://infrahub-a:8000"))
+        busy = asyncio.run(get_client_async(address="http://infrahub-b:8000"))
+        recent = asyncio.run(get_client_async(address="http://infrahub-c:8000"))
+        idle.config.requester.last_used -= 600
+        busy.config.requester.last_used -= 600
+        busy.config.requester.in_flight = 1
+
+        close_idle_clients(max_idle=300)
+
+        assert asyncio.run(get_client_async(address="http://infrahub-a:8000")) is not idle
+        assert asyncio.run(get_client_async(address="http://infrahub-b:8000")) is busy
+        assert asyncio.run(get_client_async(address="http://infrahub-c:8000")) is recent
+
+    def test_requester_reuses_pool_within_loop(self):
+        """Test that successive requests on one loop go through the same httpx pool."""
+        client = asyncio.run(get_client_async(address="http://infrahub:8000"))
+        requester = client.config.requester
+
+        async def get_pools():
+            return requester._get_pool(), requester._get_pool()
+
+        first, second = asyncio.run(get_pools())
+
+        assert first is second
+
+
+class TestBackgroundLoop:
+    """Test the shared background event loop."""
+
+    def test_run_returns_result_from_loop_thread(self):
+        """Test that coroutines run on the loop thread and their result is returned."""
+        background = BackgroundLoop()
+
+        async def current_thread():
+            return threading.current_thread()
+
+        first = background.run(current_thread())
+        second = background.run(current_thread())
+
+        assert first is second
+        assert first is not threading.current_thread()
+
+    def test_timeout_cancels_coroutine(self):
+        """Test that a timeout raises and cancels the running coroutine."""
+        background = BackgroundLoop()
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError):
+            background.run(slow(), timeout=0.2)
+
+        assert cancelled.wait(timeout=2)
+
+    def test_run_async_is_bounded(self):
+        """Test that functions decorated with run_async give up after their timeout, by default or set."""
+
+        @run_async(timeout=0.2)
+        async def hung():
+            await asyncio.sleep(10)
+
+        with pytest.raises(TimeoutError):
+            hung()
+
+        assert inspect.signature(run_sync).parameters["timeout"].default == SYNC_CALL_TIMEOUT
+
+    def test_script_thread_calls_are_replayed_on_caller(self):
+        """Test that deferred calls made on the loop are executed on the calling thread."""
+        background = BackgroundLoop()
+        threads = []
+
+        async def notify():
+            call_in_script_thread(lambda: threads.append(threading.current_thread()))
+            await asyncio.sleep(0)
+            return "done"
+
+        assert background.run(notify()) == "done"
+        assert threads == [threading.current_thread()]
+
+    def test_blocking_from_loop_thread_raises(self):
+        """Test that blocking on the loop from one of its own coroutines is refused instead of deadlocking."""
+        background = BackgroundLoop()
+
+        async def nested():
+            return background.run(asyncio.sleep(0))
+
+        with pytest.raises(RuntimeError):
+            background.run(nested())
+
+    def test_call_outside_loop_runs_immediately(self):
+        """Test that deferred calls run synchronously when not on the background loop."""
+        calls = []
+
+        call_in_script_thread(calls.append, 1)
+
+        assert calls == [1]
+
+
+class TestCheckReachabilityAsync:
+    """Test the cached reachability state and its circuit breaker."""
+
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.address = "http://infrahub:8000"
+        client.execute_graphql = AsyncMock(return_value={"InfrahubInfo": {"version": "1.2.3"}})
+        return client
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(infrahub.time, "monotonic", lambda: now[0])
+        return now
+
+    def test_healthy_server_is_not_probed_again(self, client, clock):
+        """Test that a recent success avoids a second version query."""
+        assert asyncio.run(check_reachability_async(client)) is True
+        clock[0] += 5
+        assert asyncio.run(check_reachability_async(client)) is True
+
+        assert client.execute_graphql.call_count == 1
+
+    def test_expired_health_probes_again(self, client, clock):
+        """Test that the server is probed again once the health TTL has expired."""
+        asyncio.run(check_reachability_async(client))
+        clock[0] += infrahub.HEALTH_TTL + 1
+        asyncio.run(check_reachability_async(client))
+
+        assert client.execute_graphql.call_count == 2
+
+    def test_failure_opens_circuit(self, client, clock):
+        """Test that checks fail fast while the circuit breaker is open."""
+        client.execute_graphql.side_effect = ServerNotReachableError(address=client.address)
+
+        assert asyncio.run(check_reachability_async(client)) is False
+        clock[0] += 1
+        assert asyncio.run(check_reachability_async(client)) is False
+
+        assert client.execute_graphql.call_count == 1
+
+    def test_backoff_grows_and_recovers(self, client, clock):
+        """Test that consecutive failures extend the backoff and a success closes the circuit."""
+        client.execute_graphql.side_effect = ServerNotReachableError(address=client.address)
+        asyncio.run(check_reachability_async(client))
+        clock[0] += infrahub.CIRCUIT_BACKOFF_BASE
+        asyncio.run(check_reachability_async(client))
+
+        health = infrahub.get_health(client.address)
+        assert health.failures == 2
+        assert health.open_until == clock[0] + 2 * infrahub.CIRCUIT_BACKOFF_BASE
+
+        client.execute_graphql.side_effect = None
+        clock[0] = health.open_until
+        assert asyncio.run(check_reachability_async(client)) is True
+        assert health.failures == 0
+
+    def test_consecutive_failures_invalidate_instance_caches(self, client, clock):
+        """Test that only the failing instance loses its caches, and only after several failures."""
+        client.execute_graphql.side_effect = ServerNotReachableError(address=client.address)
+        infrahub.OBJECTS_CACHE.set(address=client.address, branch="main", key="objects", value=[1])
+        infrahub.OBJECTS_CACHE.set(address="http://other:8000", branch="main", key="objects", value=[2])
+
+        for _ in range(infrahub.CACHE_INVALIDATION_FAILURES - 1):
+            asyncio.run(check_reachability_async(client))
+            clock[0] += infrahub.CIRCUIT_BACKOFF_MAX
+        assert infrahub.OBJECTS_CACHE.get(address=client.address, branch="main", key="objects") == [1]
+
+        asyncio.run(check_reachability_async(client))
+        assert infrahub.OBJECTS_CACHE.get(address=client.address, branch="main", key="objects") is None
+        assert infrahub.OBJECTS_CACHE.get(address="http://other:8000", branch="main", key="objects") == [2]
+
+
+def schema_payload(schema_hash):
+    return {
+        "main": schema_hash,
+        "nodes": [
+            {
+                "name": "Device",
+                "namespace": "Infra",
+                "kind": "InfraDevice",
+                "attributes": [{"name": "name", "kind": "Text"}],
+                "relationships": [],
+            }
+        ],
+    }
+
+
+class TestGetSchemaAsync:
+    """Test the hash-validated schema cache."""
+
+    @pytest.fixture
+    def client(self, infrahub_client):
+        client = infrahub_client
+        client.default_branch = "main"
+        client.schema_hash = "hash-1"
+        client.schema._parse_schema_response = lambda response, branch: response.json()
+
+        def get(url):
+            payload = {"main": client.schema_hash} if "/summary" in url else schema_payload(client.schema_hash)
+            return httpx.Response(200, json=payload, request=httpx.Request("GET", url))
+
+        client._get = AsyncMock(side_effect=get)
+        return client
+
+    @staticmethod
+    def requested(client, path):
+        return [call for call in client._get.call_args_list if path in call.kwargs["url"]]
+
+    def test_served_from_cache_within_interval(self, client):
+        """Test that a fresh cached schema costs no request."""
+        first = asyncio.run(get_schema_async(branch="main"))
+        second = asyncio.run(get_schema_async(branch="main"))
+
+        assert list(first) == list(second) == ["InfraDevice"]
+        assert client._get.call_count == 1
+
+    def test_unchanged_hash_does_not_refetch(self, client):
+        """Test that revalidation with an unchanged hash keeps the cached schema."""
+        asyncio.run(get_schema_async(branch="main"))
+        asyncio.run(get_schema_async(branch="main", refresh=True))
+
+        assert len(self.requested(client, "/api/schema?")) == 1
+        assert len(self.requested(client, "/api/schema/summary")) == 1
+
+    def test_changed_hash_refetches(self, client):
+        """Test that a new schema hash triggers a full download."""
+        asyncio.run(get_schema_async(branch="main"))
+        client.schema_hash = "hash-2"
+        asyncio.run(get_schema_async(branch="main", refresh=True))
+
+        assert len(self.requested(client, "/api/schema?")) == 2
+        assert infrahub._SCHEMA_CACHE.get("http://infrahub:8000", "main", "schema").hash == "hash-2"
+
+    def test_instances_are_cached_separately(self, client):
+        """Test that two instances never share a cached schema."""
+        asyncio.run(get_schema_async(branch="main"))
+        client.address = "http://lab:8000"
+        asyncio.run(get_schema_async(branch="main"))
+
+        assert len(self.requested(client, "/api/schema?")) == 2
+        assert set(infrahub._SCHEMA_CACHE.usage()) == {"http://infrahub:8000", "http://lab:8000"}
+
+    def test_branches_are_cached_separately(self, client):
+        """Test that each branch has its own cache entry."""
+        asyncio.run(get_schema_async(branch="main"))
+        asyncio.run(get_schema_async(branch="dev"))
+
+        assert len(self.requested(client, "/api/schema?")) == 2
+
+    def test_branch_is_encoded_in_hash_check(self, client):
+        """Test that the schema hash is checked for the right branch when its name needs encoding."""
+        asyncio.run(get_schema_async(branch="feature/a&b"))
+        asyncio.run(get_schema_async(branch="feature/a&b", refresh=True))
+
+        [summary] = self.requested(client, "/api/schema/summary")
+        assert summary.kwargs["url"].endswith("/api/schema/summary?branch=feature%2Fa%26b")
+
+    def test_warm_start_from_snapshot(self, client, monkeypatch, tmp_path):
+        """Test that a persisted snapshot is served at startup and revalidated in the background."""
+        monkeypatch.setattr(infrahub, "SCHEMA_CACHE_DIR", str(tmp_path))
+        asyncio.run(get_schema_async(branch="main"))
+        # Simulate a restart: empty memory cache, schema unchanged on the server
+        monkeypatch.setattr(infrahub, "_SCHEMA_CACHE", PartitionedCache())
+        client._get.reset_mock()
+
+        async def warm_start():
+            schema = await get_schema_async(branch="main")
+            assert not self.requested(client, "/api/schema?")
+            await asyncio.gather(*infrahub._BACKGROUND_TASKS)
+            return schema
+
+        schema = asyncio.run(warm_start())
+
+        assert list(schema) == ["InfraDevice"]
+        assert not self.requested(client, "/api/schema?")
+        assert len(self.requested(client, "/api/schema/summary")) == 1
+
+
+class TestSchemaSnapshots:
+    """Test the on-disk schema snapshots."""
+
+    def test_roundtrip_and_latest(self, monkeypatch, tmp_path):
+        """Test that snapshots are read back by hash, or the latest one without a hash."""
+        monkeypatch.setattr(infrahub, "SCHEMA_CACHE_DIR", str(tmp_path))
+        infrahub.write_schema_snapshot("http://infrahub:8000", "main", "hash-1", "schema", schema_payload("hash-1"))
+        infrahub.write_schema_snapshot("http://infrahub:8000", "main", "hash-2", "schema", schema_payload("hash-2"))
+
+        assert infrahub.read_schema_snapshot("http://infrahub:8000", "main", "schema", "hash-1")["main"] == "hash-1"
+        assert infrahub.read_schema_snapshot("http://infrahub:8000", "main", "schema")["main"] == "hash-2"
+        assert infrahub.read_schema_snapshot("http://infrahub:8000", "dev", "schema") is None
+
+    def test_old_snapshots_are_pruned(self, monkeypatch, tmp_path):
+        """Test that only the most recent schema hashes are kept."""
+        monkeypatch.setattr(infrahub, "SCHEMA_CACHE_DIR", str(tmp_path))
+        for index in range(infrahub.SCHEMA_SNAPSHOTS_KEPT + 2):
+            infrahub.write_schema_snapshot("http://infrahub:8000", "main", f"hash-{index}", "schema", {"main": index})
+
+        assert len(list(tmp_path.rglob("*.schema.json.gz"))) == infrahub.SCHEMA_SNAPSHOTS_KEPT
+
+    def test_disabled_without_directory(self, monkeypatch):
+        """Test that nothing is persisted when no cache directory is configured."""
+        monkeypatch.setattr(infrahub, "SCHEMA_CACHE_DIR", None)
+        infrahub.write_schema_snapshot("http://infrahub:8000", "main", "hash-1", "schema", {"main": "hash-1"})
+
+        assert infrahub.read_schema_snapshot("http://infrahub:8000", "main", "schema") is None
+
+
+class TestGetBranches:
+    """Test the branch list cache."""
+
+    @pytest.fixture
+    def client(self, infrahub_client):
+        client = infrahub_client
+        client.branch.all = AsyncMock(return_value={"main": MagicMock()})
+        client.branch.create = AsyncMock(return_value=MagicMock())
+        return client
+
+    def test_branches_are_cached(self, client):
+        """Test that successive calls reuse the cached branch list."""
+        asyncio.run(get_branches_async())
+        branches = asyncio.run(get_branches_async())
+
+        assert list(branches) == ["main"]
+        assert client.branch.all.call_count == 1
+
+    def test_expired_cache_refetches(self, client, monkeypatch):
+        """Test that the branch list is fetched again once the TTL has expired."""
+        monkeypatch.setattr(infrahub, "BRANCH_CACHE_TTL", 0)
+        asyncio.run(get_branches_async())
+        asyncio.run(get_branches_async())
+
+        assert client.branch.all.call_count == 2
+
+    def test_create_branch_invalidates_cache(self, client):
+        """Test that creating a branch makes it visible right away."""
+        asyncio.run(get_branches_async())
+        asyncio.run(create_branch.__wrapped__(branch_name="dev"))
+        client.branch.all.return_value = {"main": MagicMock(), "dev": MagicMock()}
+        branches = asyncio.run(get_branches_async())
+
+        assert list(branches) == ["main", "dev"]
+        assert client.branch.all.call_count == 2
+
+
+class TestLoadPageDataAsync:
+    """Test the concurrent page-load façade."""
+
+    @pytest.fixture
+    def client(self, infrahub_client, monkeypatch):
+        client = infrahub_client
+        monkeypatch.setattr("emma.infrahub.get_schema_async", AsyncMock(return_value={"InfraDevice": MagicMock()}))
+        monkeypatch.setattr("emma.infrahub.get_server_version_async", AsyncMock(return_value="1.2.0"))
+        branch = BranchData(
+            id="1",
+            name="main",
+            sync_with_git=True,
+            is_default=True,
+            has_schema_changes=False,
+            graph_version=1,
+            branched_from="2024-01-01T00:00:00Z",
+        )
+        monkeypatch.setattr("emma.infrahub.get_branches_async", AsyncMock(return_value={"main": branch}))
+        return client
+
+    def test_fetches_requested_data(self, client):
+        """Test that the schema, branches and version are gathered into one result."""
+        page_data = asyncio.run(load_page_data_async(branch="main", include_version=True))
+
+        assert page_data.reachable
+        assert list(page_data.infrahub_schema) == ["InfraDevice"]
+        assert list(page_data.branches) == ["main"]
+        assert page_data.version == "1.2.0"
+        infrahub.check_reachability_async.assert_awaited_once()
+
+    def test_skips_excluded_data(self, client):
+        """Test that excluded data is not fetched."""
+        page_data = asyncio.run(load_page_data_async(include_schema=False, include_branches=False))
+
+        assert page_data.infrahub_schema is None
+        assert page_data.branches is None
+        infrahub.get_schema_async.assert_not_awaited()
+        infrahub.get_branches_async.assert_not_awaited()
+        infrahub.get_server_version_async.assert_not_awaited()
+
+    def test_unreachable_server_fetches_nothing(self, client):
+        """Test that nothing is fetched when the server is unreachable."""
+        infrahub.check_reachability_async.return_value = False
+        page_data = asyncio.run(load_page_data_async())
+
+        assert not page_data.reachable
+        infrahub.get_schema_async.assert_not_awaited()
+
+
+class TestGetObjectsAsDf:
+    """Test the export of objects through a projection query."""
+
+    @pytest.fixture
+    def client(self, infrahub_client, monkeypatch):
+        client = infrahub_client
+        devices = [{"id": f"device-{index}", "name": {"value": f"device-{index}"}} for index in range(5)]
+
+        async def execute_graphql(query, branch_name=None, at=None):
+            offset = int(query.split("offset: ")[1].split(",")[0])
+            edges = [{"node": node} for node in devices[offset : offset + client.pagination_size]]
+            return {"InfraDevice": {"count": len(devices), "edges": edges}}
+
+        client.execute_graphql = AsyncMock(side_effect=execute_graphql)
+        schema = infrahub.BranchSchema.from_api_response(data=schema_payload("hash-1")).nodes
+        monkeypatch.setattr("emma.infrahub.get_schema_async", AsyncMock(return_value=schema))
+        return client
+
+    def test_all_pages_are_fetched(self, client):
+        """Test that every page is fetched and converted to one row per object."""
+        df = asyncio.run(get_objects_as_df.__wrapped__(kind="InfraDevice"))
+
+        assert client.execute_graphql.call_count == 3
+        assert list(df["index"]) == [f"device-{index}" for index in range(5)]
+        assert list(df["name"]) == [f"device-{index}" for index in range(5)]
+
+    def test_streamed_export_writes_every_page(self, client):
+        """Test that a streamed export writes the pages in order."""
+        schema = asyncio.run(infrahub.get_schema_async())["InfraDevice"]
+        writer = CsvExportWriter(columns=["name"], schema=schema)
+
+        assert asyncio.run(export_objects.__wrapped__(kind="InfraDevice", writer=writer, include_id=False)) == 5
+        assert writer.read().decode("utf-8").split() == ["name"] + [f"device-{index}" for index in range(5)]
+        assert client.execute_graphql.call_count == 3
+
+    def test_unknown_kind_returns_none(self, client):
+        """Test that a kind missing from the schema is not queried."""
+        assert asyncio.run(get_objects_as_df.__wrapped__(kind="InfraCircuit")) is None
+        client.execute_graphql.assert_not_called()
+
+    def test_point_in_time_export_is_persisted(self, client, monkeypatch, tmp_path):
+        """Test that an export at a past time is fetched at that time once, then read from disk."""
+        monkeypatch.setattr("emma.infrahub.EXPORT_CACHE_DIR", str(tmp_path))
+        at = "2025-01-01T10:00:00+02:00"
+
+        first = asyncio.run(get_objects_as_df.__wrapped__(kind="InfraDevice", columns=["name"], at=at))
+        second = asyncio.run(get_objects_as_df.__wrapped__(kind="InfraDevice", columns=["name"], at=at))
+
+        assert client.execute_graphql.call_count == 3
+        assert client.execute_graphql.call_args.kwargs["at"] == "2025-01-01T08:00:00.000000Z"
+        pd.testing.assert_frame_equal(first, second)
+        assert len(list(tmp_path.rglob("*.json.gz"))) == 1
+
+    def test_recent_point_in_time_is_not_persisted(self, client, monkeypatch, tmp_path):
+        """Test that an export at a time changes may still land at is fetched every time."""
+        monkeypatch.setattr("emma.infrahub.EXPORT_CACHE_DIR", str(tmp_path))
+
+        asyncio.run(get_objects_as_df.__wrapped__(kind="InfraDevice", at="10s"))
+        asyncio.run(get_objects_as_df.__wrapped__(kind="InfraDevice", at="10s"))
+
+        assert client.execute_graphql.call_count == 6
+        assert not list(tmp_path.rglob("*.json.gz"))
+
+    def test_archive_export(self, client, monkeypatch):
+        """Test that a bulk export archives each kind with its row count, within the global request limit."""
+        monkeypatch.setattr("emma.infrahub.EXPORT_CONCURRENCY", 1)
+        archive = asyncio.run(export_archive.__wrapped__(kinds=["InfraDevice", "InfraCircuit"], include_id=False))
+
+        with zipfile.ZipFile(io.BytesIO(archive.read())) as zip_file:
+            manifest = json.loads(zip_file.read("manifest.json"))
+            lines = zip_file.read("InfraDevice.csv").decode("utf-8").splitlines()
+
+        assert lines[0].startswith("name")
+        assert len(lines) == 6
+        assert [(entry["kind"], entry["rows"]) for entry in manifest["kinds"]] == [
+            ("InfraCircuit", None),
+            ("InfraDevice", 5),
+        ]
+        assert client.execute_graphql.call_count == 3
+
+    def test_archive_records_failed_kinds(self, client):
+        """Test that a kind failing on a timeout is recorded in the manifest of a still complete archive."""
+        client.execute_graphql.side_effect = ServerNotResponsiveError(url="http://infrahub:8000/graphql")
+        archive = asyncio.run(export_archive.__wrapped__(kinds=["InfraDevice"]))
+
+        with zipfile.ZipFile(io.BytesIO(archive.read())) as zip_file:
+            manifest = json.loads(zip_file.read("manifest.json"))
+
+        [entry] = manifest["kinds"]
+        assert (entry["kind"], entry["file"], entry["rows"]) == ("InfraDevice", None, None)
+        assert "http://infrahub:8000/graphql" in entry["error"]
+
+
+class TestRefreshExport:
+    """Test the delta export of the objects updated since a saved export."""
+
+    @pytest.fixture
+    def devices(self):
+        return {
+            f"device-{index}": {"name": f"device-{index}", "updated_at": f"2025-01-0{index + 1}T00:00:00Z"}
+            for index in range(5)
+        }
+
+    @pytest.fixture
+    def client(self, infrahub_client, monkeypatch, devices):
+        client = infrahub_client
+        client.queries = []
+
+        async def execute_graphql(query, branch_name=None, at=None):
+            client.queries.append(query)
+            if "ids: [" in query:
+                ids = json.loads(query.split("ids: ")[1].split(")")[0])
+            else:
+                offset = int(query.split("offset: ")[1].split(",")[0])
+                ids = list(devices)[offset : offset + client.pagination_size]
+            edges = []
+            for device_id in ids:
+                edge = {"node": {"id": device_id}}
+                if "name" in query:
+                    edge["node"]["name"] = {"value": devices[device_id]["name"]}
+                if "node_metadata" in query:
+                    edge["node_metadata"] = {"updated_at": devices[device_id]["updated_at"]}
+                edges.append(edge)
+            return {"InfraDevice": {"count": len(devices), "edges": edges}}
+
+        client.execute_graphql = AsyncMock(side_effect=execute_graphql)
+        schema = NodeSchemaAPI(
+            name="Device", namespace="Infra", hash="hash-1", attributes=[{"name": "name", "kind": "Text"}]
+        )
+        monkeypatch.setattr("emma.infrahub.get_schema_async", AsyncMock(return_value={"InfraDevice": schema}))
+        return client
+
+    def test_only_changed_objects_are_fetched(self, client, devices):
+        """Test that updated objects are fetched by ID and merged, and deleted objects dropped."""
+        saved = asyncio.run(refresh_export.__wrapped__(kind="InfraDevice"))
+        assert list(saved.df["name"]) == [f"device-{index}" for index in range(5)]
+        assert saved.since == pd.Timestamp("2025-01-05T00:00:00Z")
+        # The first export fetches the update times along with the objects, in a single scan
+        assert len(client.queries) == 3
+
+        devices["device-1"] = {"name": "renamed", "updated_at": "2025-02-01T00:00:00Z"}
+        del devices["device-3"]
+        client.queries.clear()
+        refreshed = asyncio.run(refresh_export.__wrapped__(kind="InfraDevice", saved=saved))
+
+        assert list(refreshed.df["index"]) == ["device-0", "device-1", "device-2", "device-4"]
+        assert list(refreshed.df["name"]) == ["device-0", "renamed", "device-2", "device-4"]
+        assert refreshed.since == pd.Timestamp("2025-02-01T00:00:00Z")
+        # Two pages of the light scan, then a single request for the changed object and the latest one saved
+        assert len(client.queries) == 3
+        assert 'ids: ["device-1", "device-4"]' in client.queries[-1]
+
+    def test_schema_change_fetches_everything(self, client):
+        """Test that a saved export of an older schema of the kind is fetched again in full."""
+        saved = asyncio.run(refresh_export.__wrapped__(kind="InfraDevice"))
+        saved.schema_hash = "hash-0"
+        client.queries.clear()
+
+        refreshed = asyncio.run(refresh_export.__wrapped__(kind="InfraDevice", saved=saved))
+
+        assert len(refreshed.df) == 5
+        assert not any("ids: [" in query for query in client.queries)
+
+
+class TestResolveHfids:
+    """Test the bulk resolution of related nodes referenced by HFID."""
+
+    @pytest.fixture
+    def client(self, infrahub_client):
+        client = infrahub_client
+        sites = {f"site-{index}": f"id-{index}" for index in range(5)}
+
+        async def execute_graphql(query, branch_name=None, at=None):
+            if "count" in query:
+                offset = int(query.split("offset: ")[1].split(",")[0])
+                limit = int(query.split("limit: ")[1].split(")")[0])
+                edges = [{"node": {"id": sites[name], "hfid": [name]}} for name in list(sites)[offset : offset + limit]]
+                return {"LocationSite": {"count": len(sites), "edges": edges}}
+            response = {}
+            for line in query.splitlines():
+                if "(hfid: " in line:
+                    alias = line.split(":")[0].strip()
+                    name = json.loads(line.split("hfid: ")[1].split(")")[0])[0]
+                    response[alias] = {"edges": [{"node": {"id": sites[name]}}] if name in sites else []}
+            return response
+
+        client.execute_graphql = AsyncMock(side_effect=execute_graphql)
+        return client
+
+    def test_few_hfids_are_looked_up_in_one_query(self, client):
+        """Test that the HFIDs of a kind are looked up together, unknown ones being left out."""
+        references = {"LocationSite": {("site-1",), ("site-3",), ("site-9",)}}
+
+        resolved = asyncio.run(resolve_hfids.__wrapped__(references=references))
+
+        assert resolved == {("LocationSite", ("site-1",)): "id-1", ("LocationSite", ("site-3",)): "id-3"}
+        assert client.execute_graphql.call_count == 1
+
+    def test_session_address_is_used(self, client):
+        """Test that the HFIDs are resolved on the instance of the session, not the one of the environment."""
+        asyncio.run(resolve_hfids.__wrapped__(references={"LocationSite": {("site-1",)}}, address="http://lab:8000"))
+
+        infrahub.get_client_async.assert_awaited_once_with(address="http://lab:8000")
+
+    def test_small_kinds_are_indexed(self, client, monkeypatch):
+        """Test that the whole index of a small kind is fetched when many of its objects are referenced."""
+        monkeypatch.setattr("emma.infrahub.HFID_LOOKUPS_PER_QUERY", 2)
+        references = {"LocationSite": {("site-0",), ("site-2",), ("site-4",)}}
+
+        resolved = asyncio.run(resolve_hfids.__wrapped__(references=references))
+
+        assert resolved == {
+            ("LocationSite", ("site-0",)): "id-0",
+            ("LocationSite", ("site-2",)): "id-2",
+            ("LocationSite", ("site-4",)): "id-4",
+        }
+        # The three pages of the index, the first one giving the count
+        assert client.execute_graphql.call_count == 3
+
+    def test_query_error_is_raised(self, client):
+        """Test that a failing query is raised, instead of every HFID being reported as not found."""
+        client.execute_graphql.side_effect = GraphQLError(errors=[{"message": "permission denied"}])
+
+        with pytest.raises(GraphQLError):
+            asyncio.run(resolve_hfids.__wrapped__(references={"LocationSite": {("site-1",)}}))
+
+
+class FakeBatch:
+    """Batch running its tasks one after the other, failing for the nodes named "fail"."""
+
+    def __init__(self, **kwargs):
+        self.tasks = []
+
+    def add(self, task, node, **kwargs):
+        self.tasks.append(node)
+
+    async def execute(self):
+        for node in self.tasks:
+            yield node, ValueError("rejected") if node.data["name"] == "fail" else None
+
+
+class TestImportCsv:
+    """Test the chunked import pipeline."""
+
+    @pytest.fixture
+    def client(self, infrahub_client, monkeypatch):
+        client = infrahub_client
+
+        async def execute_graphql(query, branch_name=None, at=None, **kwargs):
+            if query.startswith("mutation"):
+                if "document-error" in query:
+                    raise GraphQLError(errors=[{"message": "invalid document"}])
+                if "fail" in query:
+                    raise GraphQLError(errors=[{"message": "rejected", "path": ["upsert0", "object"]}])
+                if "timeout" in query:
+                    raise ServerNotResponsiveError(url="http://infrahub:8000/graphql")
+                return {}
+            return {"hfid0": {"edges": [{"node": {"id": "site-id"}}]}}
+
+        def create(kind, branch, data):
+            node = MagicMock(data=data)
+            node._generate_input_data.return_value = {
+                "data": {"data": {"name": {"value": data["name"]}}},
+                "variables": {},
+                "mutation_variables": {},
+            }
+            node.save = AsyncMock(side_effect=GraphQLError(errors=[]) if data["name"] == "fail" else None)
+            return node
+
+        client.execute_graphql = AsyncMock(side_effect=execute_graphql)
+        client.create_batch = AsyncMock(side_effect=FakeBatch)
+        client.create = AsyncMock(side_effect=create)
+        schema = NodeSchemaAPI(
+            name="Device",
+            namespace="Infra",
+            attributes=[{"name": "name", "kind": "Text"}],
+            relationships=[{"name": "site", "peer": "LocationSite", "cardinality": "one"}],
+        )
+        monkeypatch.setattr("emma.infrahub.get_schema_async", AsyncMock(return_value={"InfraDevice": schema}))
+        return client
+
+    def test_chunks_are_saved_with_resolved_references(self, client):
+        """Test that every chunk is saved, each HFID being resolved once and failures mapped to their row."""
+        source = io.StringIO(
+            "name,site\nd0,LocationSite__atl1\nd1,LocationSite__atl1\nfail,\nd3,[]\nd4,LocationSite__atl1\n"
+        )
+        updates = []
+
+        progress = asyncio.run(
+            import_csv.__wrapped__(
+                source=source, kind="InfraDevice", branch="main", chunk_size=2, on_progress=updates.append
+            )
+        )
+
+        assert (progress.rows_read, progress.rows_saved, progress.rows_failed) == (5, 4, 1)
+        assert progress.errors == ["Line 2: rejected"]
+        assert progress.done
+        assert [update.rows_saved for update in updates] == [2, 3, 4]
+        assert client.execute_graphql.call_count == 1
+        assert client.create.call_args_list[0].kwargs["data"] == {"name": "d0", "site": "site-id"}
+        assert client.create.call_args_list[3].kwargs["data"] == {"name": "d3"}
+
+    def test_objects_are_upserted_with_aliased_mutations(self, client):
+        """Test that objects are upserted several at a time, errors being mapped back to their row."""
+        source = io.StringIO("name\nd0\nd1\nfail\nd3\nd4\n")
+
+        progress = asyncio.run(
+            import_csv.__wrapped__(source=source, kind="InfraDevice", branch="main", objects_per_request=2)
+        )
+
+        assert (progress.rows_saved, progress.rows_failed) == (4, 1)
+        assert progress.errors == ["Line 2: rejected"]
+        mutations = [call.kwargs["query"] for call in client.execute_graphql.call_args_list]
+        assert len(mutations) == 3
+        assert "upsert1: InfraDeviceUpsert(" in mutations[0]
+        client.create_batch.assert_not_called()
+
+    def test_rejected_mutation_is_retried_per_object(self, client):
+        """Test that the objects of a mutation rejected as a whole are saved one at a time."""
+        source = io.StringIO("name\ndocument-error\nfail\nd2\n")
+
+        progress = asyncio.run(
+            import_csv.__wrapped__(source=source, kind="InfraDevice", branch="main", objects_per_request=3)
+        )
+
+        assert (progress.rows_saved, progress.rows_failed) == (2, 1)
+        assert progress.errors[0].startswith("Line 1: ")
+
+    def test_mutation_failing_in_transit_fails_its_objects(self, client):
+        """Test that a mutation which timed out fails each of its objects, the other mutations being saved."""
+        source = io.StringIO("name\nd0\ntimeout\nd2\nd3\n")
+
+        progress = asyncio.run(
+            import_csv.__wrapped__(source=source, kind="InfraDevice", branch="main", objects_per_request=2)
+        )
+
+        assert (progress.rows_saved, progress.rows_failed) == (2, 2)
+        assert [error.split(":")[0] for error in progress.errors] == ["Line 0", "Line 1"]
+        assert progress.error is None
+
+    @pytest.mark.parametrize(
+        "content",
+        [b'name\nd0\n"unterminated\n', b"name\n\xff\xfe\n"],
+        ids=["invalid-csv", "invalid-encoding"],
+    )
+    def test_unreadable_file_stops_the_import(self, client, content):
+        """Test that a file which cannot be parsed or decoded stops the import with the error reported."""
+        progress = asyncio.run(import_csv.__wrapped__(source=io.BytesIO(content), kind="InfraDevice", branch="main"))
+
+        assert progress.done
+        assert progress.error.startswith("Reading the file failed: ")
+        assert progress.rows_saved == 0
+
+
+class TestExecuteBatch:
+    """Test the execution of import batches through a concurrency limiter."""
+
+    def test_saves_are_limited_and_reported(self, monkeypatch):
+        """Test that saves go through the limiter, whose stats are reported once the batch is done."""
+        monkeypatch.setattr("emma.infrahub.st", MagicMock())
+        limiter = ConcurrencyLimiter(max_in_flight=2)
+        batch = InfrahubBatch(max_concurrent_execution=10, return_exceptions=True)
+        for name in ("d0", "fail", "d2"):
+            save = AsyncMock(side_effect=GraphQLError(errors=[]) if name == "fail" else None)
+            batch.add(save, task=limiter.run, allow_upsert=True, node=MagicMock())
+        reports = []
+
+        asyncio.run(execute_batch.__wrapped__(batch=batch, limiter=limiter, on_progress=reports.append))
+
+        assert [(stats.completed, stats.failed, stats.in_flight) for stats in reports] == [(2, 1, 0)]
+
+
+class TestPeerResolver:
+    """Test the deduplicated, bounded resolution of related nodes."""
+
+    @staticmethod
+    def make_peer(peer_id, fetches, running):
+        peer = MagicMock()
+        peer.id = peer_id
+        peer.peer.hfid = [peer_id]
+        peer.peer.get_human_friendly_id_as_string.return_value = f"LocationSite__{peer_id}"
+
+        async def fetch():
+            running.append(peer_id)
+            fetches.append(max(fetches[-1] if fetches else 0, len(running)))
+            await asyncio.sleep(0.01)
+            running.remove(peer_id)
+
+        peer.fetch = fetch
+        return peer
+
+    @pytest.fixture
+    def client(self):
+        client = MagicMock()
+        client.store.get.return_value = None
+        return client
+
+    def test_shared_peer_is_fetched_once(self, client):
+        """Test that a peer related to many nodes is only fetched once."""
+        fetches, running = [], []
+
+        async def resolve():
+            resolver = PeerResolver(client=client, concurrency=5)
+            peers = [self.make_peer("atl1", fetches, running) for _ in range(50)]
+            return await asyncio.gather(*(resolver.resolve(peer) for peer in peers))
+
+        references = asyncio.run(resolve())
+
+        assert set(references) == {"LocationSite__atl1"}
+        assert len(fetches) == 1
+
+    def test_concurrency_is_bounded(self, client):
+        """Test that no more than `concurrency` peers are fetched at the same time."""
+        fetches, running = [], []
+
+        async def resolve():
+            resolver = PeerResolver(client=client, concurrency=3)
+            peers = [self.make_peer(f"site-{index}", fetches, running) for index in range(10)]
+            return await asyncio.gather(*(resolver.resolve(peer) for peer in peers))
+
+        asyncio.run(resolve())
+
+        assert len(fetches) == 10
+        assert max(fetches) == 3
+
+    def test_peer_in_store_is_not_fetched(self, client):
+        """Test that peers already in the store cost no request."""
+        fetches, running = [], []
+        client.store.get.return_value = MagicMock(hfid=None, id="site-1")
+
+        async def resolve():
+            resolver = PeerResolver(client=client, concurrency=3)
+            return await resolver.resolve(self.make_peer("site-1", fetches, running))
+
+        assert asyncio.run(resolve()) == "site-1"
+        assert not fetches